@@ -1,25 +1,34 @@
 import os
-import json
 import time
-import traceback
-from applicants import main_applicants
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
+import random
+import asyncio
+import itertools
+import logging
+import argparse
+from applicants import main_applicants, main_applicants_batch, read_detailed_applications, fetch_job_openings, select_jobs
+from instrumentation import metrics, configure_logging
+from evaluation_journal import EvaluationJournal, journal_path
+from record_io import chunked, read_records, records_path, write_records
+from evaluation_cache import EvaluationCache, CACHE_BYPASS, cache_key
+from candidate_dedup import CandidateDeduplicator
+from dead_letters import DeadLetterStore, evaluation_dead_letter_path, replay_entries, error_class
+from zoho_records import Application, APPLICATION_ID
+from profile_renderer import ProfileRenderer, default_renderer, load_encoding
+from prescreen import prescreen_candidates, PRESCREEN_ENABLED, FRONTEND_REQUIRED_TECH, LARAVEL_REQUIRED_TECH
+# LangChain and the Gemini client take seconds to import, so they are imported where used
 from system_prompts.system_prompt_frontend import system_prompt_frontend
 from system_prompts.system_prompt_laravel import system_prompt_laravel
 
+MODEL_CONFIG = {"model": "gemini-2.0-flash", "temperature": 0.1}
+
 def initialize_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
     return ChatGoogleGenerativeAI(
-        temperature=0.1,
-        model="gemini-2.0-flash",
+        **MODEL_CONFIG,
         google_api_key=os.getenv('GOOGLE_API_KEY')
     )
 
-def create_candidate_evaluation_prompt(system_prompt):
-    return ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("human", """
+CANDIDATE_EVALUATION_TEMPLATE = """
         Job Description:
         {job_description}
 
@@ -27,135 +36,557 @@ def create_candidate_evaluation_prompt(system_prompt):
         {candidate_profile}
 
         Provide a comprehensive evaluation in strict JSON format.
-        """)
+        """
+
+BATCH_EVALUATION_TEMPLATE = """
+        Job Description:
+        {job_description}
+
+        Evaluate each of the following candidates independently against the job description.
+
+        {candidate_profiles}
+
+        Respond with a strict JSON array containing one evaluation object per candidate.
+        Every object must include "candidate_id", copied exactly from the candidate's profile,
+        in addition to the required evaluation keys.
+        """
+
+def create_candidate_evaluation_prompt(system_prompt):
+    from langchain.prompts import ChatPromptTemplate
+    return ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("human", CANDIDATE_EVALUATION_TEMPLATE)
     ])
 
-def evaluate_candidates(job_description, detailed_applications, job_title):
-    try:
-        with open(rf'json\evaluation_progress_{job_title}.json', 'r') as f:
-            progress = json.load(f)
-        selected_candidates = progress.get('selected_candidates', [])
-        rejected_candidates = progress.get('rejected_candidates', [])
-        start_index = progress.get('last_processed_index', 0)
-    except FileNotFoundError:
-        selected_candidates = []
-        rejected_candidates = []
-        start_index = 0
+def create_batch_evaluation_prompt(system_prompt):
+    from langchain.prompts import ChatPromptTemplate
+    return ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("human", BATCH_EVALUATION_TEMPLATE)
+    ])
+
+EVALUATION_CONCURRENCY = int(os.getenv('EVALUATION_CONCURRENCY', 5))
+# Candidates packed into one request; 1 keeps the one-candidate-per-call prompt
+EVALUATION_BATCH_SIZE = int(os.getenv('EVALUATION_BATCH_SIZE', 1))
+# Candidates read, pre-screened and evaluated together; bounds memory on large pools
+EVALUATION_CHUNK_SIZE = int(os.getenv('EVALUATION_CHUNK_SIZE', 1000))
+MAX_RETRIES = 3
+BASE_DELAY = 5
+# Log an info-level progress line every this many candidates; per-candidate lines are debug
+PROGRESS_LOG_EVERY = int(os.getenv('PROGRESS_LOG_EVERY', 100))
+
+logger = logging.getLogger(__name__)
+LLM_REQUEST_SECONDS = metrics.histogram('llm_request_seconds', 'LLM evaluation request latency by mode and outcome')
+LLM_REQUESTS = metrics.counter('llm_requests_total', 'LLM evaluation requests by mode and outcome')
+LLM_RETRIES = metrics.counter('llm_retries_total', 'LLM evaluation requests retried after a failure')
+LLM_TOKENS = metrics.counter('llm_tokens_total', 'LLM token usage reported by the model, by direction')
+LLM_IN_FLIGHT = metrics.gauge('llm_requests_in_flight', 'LLM evaluation requests currently awaiting a response')
+CANDIDATES_EVALUATED = metrics.counter('candidates_evaluated_total', 'Candidates evaluated by outcome')
+
+def record_token_usage(response):
+    """Adds the usage metadata of a chat model response to llm_tokens_total."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+            if usage:
+                LLM_TOKENS.inc(usage.get('input_tokens', 0), direction='input')
+                LLM_TOKENS.inc(usage.get('output_tokens', 0), direction='output')
+
+_llm_call_config = None
 
-    llm = initialize_llm()
+def llm_call_config():
+    """Invoke config carrying the token usage callback, built on first use."""
+    global _llm_call_config
+    if _llm_call_config is None:
+        from langchain_core.callbacks import BaseCallbackHandler
 
+        class TokenUsageCallback(BaseCallbackHandler):
+            def on_llm_end(self, response, **kwargs):
+                record_token_usage(response)
+
+        _llm_call_config = {"callbacks": [TokenUsageCallback()]}
+    return _llm_call_config
+
+def llm_outcome(error):
+    return 'rate_limited' if error_class(error) == 'rate_limited' else 'error'
+
+def observe_llm_call(mode, outcome, started):
+    LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, mode=mode, outcome=outcome)
+    LLM_REQUESTS.inc(mode=mode, outcome=outcome)
+
+def select_system_prompt(job_title):
     if (job_title=='Senior Frontend Developer'):
-        system_prompt = system_prompt_frontend
-    else:
-        system_prompt = system_prompt_laravel
+        return system_prompt_frontend
+    return system_prompt_laravel
 
-    prompt = create_candidate_evaluation_prompt(system_prompt=system_prompt)
+def select_required_tech(job_title):
+    if (job_title=='Senior Frontend Developer'):
+        return FRONTEND_REQUIRED_TECH
+    return LARAVEL_REQUIRED_TECH
+
+def evaluation_cache_context(job_title, batch=False):
+    """Prompt and model inputs that, with the profile and JD, key the evaluation cache."""
+    template = BATCH_EVALUATION_TEMPLATE if batch else CANDIDATE_EVALUATION_TEMPLATE
+    return (select_system_prompt(job_title), template, MODEL_CONFIG)
+
+def build_evaluation_chain(job_title, llm=None):
+    from langchain_core.output_parsers import JsonOutputParser
+    llm = llm or initialize_llm()
+    prompt = create_candidate_evaluation_prompt(system_prompt=select_system_prompt(job_title))
     output_parser = JsonOutputParser()
-    chain = prompt | llm | output_parser
+    return prompt | llm | output_parser
 
-    candidates_to_process = detailed_applications[start_index:]
+def build_batch_evaluation_chain(job_title, llm=None):
+    from langchain_core.output_parsers import JsonOutputParser
+    llm = llm or initialize_llm()
+    prompt = create_batch_evaluation_prompt(system_prompt=select_system_prompt(job_title))
+    output_parser = JsonOutputParser()
+    return prompt | llm | output_parser
 
-    max_retries = 3
-    base_delay = 5 
+def build_candidate_profile(candidate, renderer=None):
+    return (renderer or default_renderer).render(candidate)
 
-    for index, candidate in enumerate(candidates_to_process, start=start_index):
-        print(f"Evaluating Candidate {index+1}/{len(detailed_applications)}")
+def build_candidate_result(candidate, evaluation, job_title):
+    return {
+        "application_id": application_key(candidate),
+        "candidate_id": candidate_key(candidate),
+        "position_applied": job_title,
+        "phone": candidate.get('Mobile', 'N/A'),
+        "email": candidate.get('Email', 'N/A'),
+        "full_name": candidate.get('Full_Name', 'N/A'),
+        "first_name": candidate.get('First_Name', 'N/A'),
+        "last_name": candidate.get('Last_Name', 'N/A'),
+        "score": evaluation.get('score', 0),
+        "recommendation": evaluation.get('recommendation', 'Reject'),
+        "reasoning": evaluation.get('reasoning', 'No detailed reasoning'),
+        "strong_points": evaluation.get('strong_points', []),
+        "areas_of_concern": evaluation.get('areas_of_concern', [])
+    }
 
-        candidate_profile = f"""
-        Name: {candidate.get('Full_Name', 'N/A')}
-        Current Role: {candidate.get('Current_Job_Title', 'N/A')}
-        Experience: {candidate.get('Experience_in_Years', 0)} years
-        Skills: {candidate.get('Skill_Set', 'N/A')}
-        Work Experience:
-        {json.dumps(candidate.get('Experience_Details', []), indent=2)}
-        Education: {json.dumps(candidate.get('Educational_Details', []), indent=2)}
-        """
+def candidate_key(candidate):
+    return candidate.get('$Candidate_Id') or candidate.get('id') or candidate.get('Email')
+
+def application_key(candidate):
+    """Journal and result key: one per application, so a person's several applications each keep a row."""
+    return candidate.get(APPLICATION_ID) or candidate_key(candidate)
 
-        # Retry mechanism
-        for attempt in range(max_retries):
+async def evaluate_candidate(chain, job_description, candidate, semaphore, cache=None, cache_context=(), max_retries=MAX_RETRIES, base_delay=BASE_DELAY, renderer=None):
+    """Evaluates one candidate, retrying with backoff without holding a concurrency slot.
+
+    cache_context carries the remaining inputs (system prompt, human template, model config)
+    that make up the cache key alongside the profile and job description.
+    renderer is the run's ProfileRenderer, so concurrent runs keep separate
+    token stats.
+    """
+    candidate_profile = build_candidate_profile(candidate, renderer)
+
+    if cache is not None:
+        key = cache_key(candidate_profile, job_description, *cache_context)
+        evaluation = cache.get(key)
+        if evaluation is not None:
+            return evaluation
+
+    for attempt in range(max_retries):
+        async with semaphore:
+            LLM_IN_FLIGHT.inc()
+            started = time.perf_counter()
             try:
-                # Invoke the chain
-                evaluation = chain.invoke({
+                evaluation = await chain.ainvoke({
                     "job_description": job_description,
                     "candidate_profile": candidate_profile
-                })
-
-                # Prepare candidate result
-                candidate_result = {
-                    "position_applied": job_title,
-                    "phone": candidate.get('Mobile', 'N/A'),
-                    "email": candidate.get('Email', 'N/A'),
-                    "full_name": candidate.get('Full_Name', 'N/A'),
-                    "first_name": candidate.get('First_Name', 'N/A'),
-                    "last_name": candidate.get('Last_Name', 'N/A'),
-                    "score": evaluation.get('score', 0),
-                    "recommendation": evaluation.get('recommendation', 'Reject'),
-                    "reasoning": evaluation.get('reasoning', 'No detailed reasoning'),
-                    "strong_points": evaluation.get('strong_points', []),
-                    "areas_of_concern": evaluation.get('areas_of_concern', [])
-                }
-                print(f"Result: \n{candidate_result}")
-                # Categorize candidates
-                if evaluation.get('recommendation') == 'Shortlist':
-                    selected_candidates.append(candidate_result)
-                else:
-                    rejected_candidates.append(candidate_result)
+                }, config=llm_call_config())
+                observe_llm_call('single', 'success', started)
+                if cache is not None:
+                    cache.put(key, evaluation)
+                return evaluation
+            except Exception as e:
+                error = e
+                observe_llm_call('single', llm_outcome(e), started)
+                logger.warning("Error processing candidate", extra={'candidate': candidate.get('Full_Name'), 'attempt': attempt + 1, 'error': str(e)})
+            finally:
+                LLM_IN_FLIGHT.dec()
+
+        # Exponential backoff with jitter; the slot is released so other candidates keep flowing
+        if attempt < max_retries - 1:
+            delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
+            LLM_RETRIES.inc(mode='single')
+            logger.info("Retrying candidate", extra={'candidate': candidate.get('Full_Name'), 'delay_seconds': round(delay, 1), 'attempt': attempt + 1, 'max_retries': max_retries})
+            await asyncio.sleep(delay)
+
+    raise error
+
+def render_candidate_batch(profiles):
+    return "\n".join(
+        f"Candidate ID: {key}\nCandidate Profile:\n{profile}\n"
+        for key, profile in profiles.items()
+    )
+
+def parse_batch_evaluations(response, expected_keys):
+    """Keeps the well-formed evaluations for expected candidate IDs from a batch response."""
+    if isinstance(response, dict):
+        response = response.get('evaluations') or response.get('candidates') or [response]
+    if not isinstance(response, list):
+        return {}
+
+    evaluations = {}
+    for entry in response:
+        if not isinstance(entry, dict):
+            continue
+        key = str(entry.get('candidate_id'))
+        if key in expected_keys and key not in evaluations and 'score' in entry and entry.get('recommendation') in ('Shortlist', 'Reject'):
+            evaluations[key] = entry
+    return evaluations
 
-                # Save progress after each successful evaluation
-                progress = {
-                    'selected_candidates': selected_candidates,
-                    'rejected_candidates': rejected_candidates,
-                    'last_processed_index': index + 1
-                }
-                with open(rf'json\evaluation_progress_{job_title}.json', 'w') as f:
-                    json.dump(progress, f, indent=4)
+async def evaluate_batch(batch_chain, job_description, candidates, semaphore, cache=None, cache_context=(), max_retries=MAX_RETRIES, base_delay=BASE_DELAY, renderer=None):
+    """Evaluates several candidates per request.
 
-                # Break retry loop if successful
-                break
+    Entries that come back missing or malformed are re-sent on their own
+    in the next attempt; the rest of the batch is kept. Returns
+    (evaluations, errors), both keyed by str(application_key).
+    """
+    profiles = {str(application_key(candidate)): build_candidate_profile(candidate, renderer) for candidate in candidates}
+    evaluations = {}
+    keys = {}
 
+    if cache is not None:
+        for key, candidate_profile in profiles.items():
+            keys[key] = cache_key(candidate_profile, job_description, *cache_context)
+            evaluation = cache.get(keys[key])
+            if evaluation is not None:
+                evaluations[key] = evaluation
+
+    pending = [key for key in profiles if key not in evaluations]
+    error = None
+    for attempt in range(max_retries):
+        if not pending:
+            break
+
+        failed = False
+        async with semaphore:
+            LLM_IN_FLIGHT.inc()
+            started = time.perf_counter()
+            try:
+                response = await batch_chain.ainvoke({
+                    "job_description": job_description,
+                    "candidate_profiles": render_candidate_batch({key: profiles[key] for key in pending})
+                }, config=llm_call_config())
+                observe_llm_call('batch', 'success', started)
+                returned = parse_batch_evaluations(response, set(pending))
+                for key, evaluation in returned.items():
+                    evaluations[key] = evaluation
+                    if cache is not None:
+                        cache.put(keys[key], evaluation)
+                pending = [key for key in pending if key not in returned]
+                if pending:
+                    error = ValueError(f"Batch response missing or malformed for {len(pending)} candidates")
+                    LLM_RETRIES.inc(len(pending), mode='requeued')
+                    logger.warning("Re-queueing missing or malformed batch entries", extra={'candidates': len(pending)})
             except Exception as e:
-                print(f"Error processing candidate {candidate.get('Full_Name')}: {e}")
-                print(traceback.format_exc())
-
-                # Exponential backoff for retries
-                if attempt < max_retries - 1:
-                    delay = base_delay * (2 ** attempt)
-                    print(f"Retrying in {delay} seconds... (Attempt {attempt + 1}/{max_retries})")
-                    time.sleep(delay)
+                error = e
+                failed = True
+                observe_llm_call('batch', llm_outcome(e), started)
+                logger.warning("Error processing batch", extra={'candidates': len(pending), 'attempt': attempt + 1, 'error': str(e)})
+            finally:
+                LLM_IN_FLIGHT.dec()
+
+        # Only a failed request backs off; re-queued entries go straight back out
+        if failed and attempt < max_retries - 1:
+            delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
+            LLM_RETRIES.inc(mode='batch')
+            logger.info("Retrying batch", extra={'delay_seconds': round(delay, 1), 'attempt': attempt + 1, 'max_retries': max_retries})
+            await asyncio.sleep(delay)
+
+    return evaluations, {key: error for key in pending}
+
+def dead_letter_payload(candidate):
+    return candidate.to_dict() if hasattr(candidate, 'to_dict') else dict(candidate)
+
+def record_failure(journal, dead_letters, candidate, error, job_title):
+    CANDIDATES_EVALUATED.inc(status='failed')
+    logger.error("Failed to process candidate", exc_info=error if isinstance(error, BaseException) else None,
+                 extra={'application_id': application_key(candidate), 'candidate_id': candidate_key(candidate), 'candidate': candidate.get('Full_Name'), 'attempts': MAX_RETRIES})
+    # Recorded as processed so a resume does not retry it; --replay-failed picks it up from the dead-letter store
+    journal.append(application_key(candidate), 'failed', None)
+    dead_letters.add(candidate_key(candidate), dead_letter_payload(candidate), error, MAX_RETRIES, key=application_key(candidate))
+
+def evaluation_status(evaluation):
+    return 'selected' if evaluation.get('recommendation') == 'Shortlist' else 'rejected'
+
+def record_evaluation(journal, candidate, evaluation, job_title):
+    """Journals one evaluation and returns (status, candidate_result)."""
+    candidate_result = build_candidate_result(candidate, evaluation, job_title)
+    # Categorize candidates
+    status = evaluation_status(evaluation)
+    journal.append(application_key(candidate), status, candidate_result)
+    CANDIDATES_EVALUATED.inc(status=status)
+    logger.debug("Evaluated candidate", extra={'application_id': application_key(candidate), 'status': status, 'score': candidate_result['score']})
+    return status, candidate_result
+
+def record_auto_rejection(journal, candidate, reason, job_title):
+    evaluation = {"score": 0, "recommendation": "Reject", "reasoning": reason, "areas_of_concern": [reason]}
+    journal.append(application_key(candidate), 'rejected', build_candidate_result(candidate, evaluation, job_title))
+    CANDIDATES_EVALUATED.inc(status='auto_rejected')
+
+async def evaluate_candidates_async(job_description, detailed_applications, job_title, concurrency=EVALUATION_CONCURRENCY, bypass_cache=CACHE_BYPASS, prescreen=PRESCREEN_ENABLED, batch_size=EVALUATION_BATCH_SIZE, llm=None, semaphore=None):
+    """Evaluates an iterable of candidates, EVALUATION_CHUNK_SIZE at a time.
+
+    detailed_applications may be a list or a stream such as read_detailed_applications();
+    only the current chunk is held in memory. Applications from the same
+    person (see CandidateDeduplicator) are evaluated once and the result is
+    recorded for each of them. Returns (selected, rejected) counts; the
+    results themselves are in the files from results_path().
+    """
+    journal = EvaluationJournal(journal_path(job_title))
+    dead_letters = DeadLetterStore(evaluation_dead_letter_path(job_title), 'evaluate')
+    done = journal.replay()
+    total = len(detailed_applications) if hasattr(detailed_applications, '__len__') else None
+    if done:
+        logger.info("Resuming evaluation", extra={'already_evaluated': len(done)})
+
+    chain = build_batch_evaluation_chain(job_title, llm) if batch_size > 1 else build_evaluation_chain(job_title, llm)
+    # Callers screening several jobs pass one semaphore so they share a single concurrency budget
+    semaphore = semaphore or asyncio.Semaphore(concurrency)
+    cache = EvaluationCache(bypass=bypass_cache)
+    cache_context = evaluation_cache_context(job_title, batch=batch_size > 1)
+    evaluated = len(done)
+    # Keeps a first-use download of the tokenizer off the event loop
+    await asyncio.to_thread(load_encoding)
+    # One renderer per run: evaluate_jobs_async runs several of these at once
+    renderer = ProfileRenderer()
+    dedup = CandidateDeduplicator()
+    # Group of each candidate sent to the LLM, and the duplicates waiting on its result
+    groups = {}
+    followers = {}
+
+    def record(candidate, evaluation=None, error=None):
+        nonlocal evaluated
+        if error is not None:
+            record_failure(journal, dead_letters, candidate, error, job_title)
+        else:
+            record_evaluation(journal, candidate, evaluation, job_title)
+            dead_letters.resolve(application_key(candidate))
+
+        evaluated += 1
+        if evaluated % PROGRESS_LOG_EVERY == 0 or evaluated == total:
+            logger.info("Evaluation progress", extra={'evaluated': evaluated, 'total': total})
+
+        group = groups.pop(id(candidate), None)
+        if group is not None:
+            if error is None:
+                dedup.record_evaluation(group, evaluation)
+            for follower in followers.pop(group, []):
+                record(follower, evaluation, error)
+
+    async def process(candidate):
+        try:
+            evaluation = await evaluate_candidate(chain, job_description, candidate, semaphore, cache, cache_context, renderer=renderer)
+        except Exception as e:
+            record(candidate, error=e)
+        else:
+            record(candidate, evaluation)
+
+    async def process_batch(candidates):
+        evaluations, errors = await evaluate_batch(chain, job_description, candidates, semaphore, cache, cache_context, renderer=renderer)
+        for candidate in candidates:
+            key = str(application_key(candidate))
+            if key in evaluations:
+                record(candidate, evaluations[key])
+            else:
+                record(candidate, error=errors.get(key))
+
+    auto_rejected_total = sent_to_llm = 0
+    with journal, cache, dead_letters:
+        for chunk in chunked(detailed_applications, EVALUATION_CHUNK_SIZE):
+            candidates_to_process = [candidate for candidate in chunk if application_key(candidate) not in done]
+            if prescreen:
+                candidates_to_process, auto_rejected = prescreen_candidates(
+                    candidates_to_process, job_description, select_required_tech(job_title)
+                )
+                for candidate, reason in auto_rejected:
+                    record_auto_rejection(journal, candidate, reason, job_title)
+                evaluated += len(auto_rejected)
+                auto_rejected_total += len(auto_rejected)
+
+            representatives = []
+            for candidate in candidates_to_process:
+                group = dedup.group(candidate)
+                evaluation = dedup.evaluation(group)
+                if evaluation is not None:
+                    dedup.skipped()
+                    record(candidate, evaluation)
+                elif group in followers:
+                    dedup.skipped()
+                    followers[group].append(candidate)
                 else:
-                    print(f"Failed to process {candidate.get('Full_Name')} after {max_retries} attempts.")
-                    # Optionally, log failed candidates to a separate file
-                    with open(rf'json\failed_candidates_{job_title}.json', 'a') as f:
-                        json.dump({
-                            'full_name': candidate.get('Full_Name'),
-                            'error': str(e)
-                        }, f)
-                        f.write('\n')
-
-    # Save final results
-    with open(rf'json\selected_candidates_{job_title}.json', 'w') as f:
-        json.dump(selected_candidates, f, indent=4)
-    
-    with open(rf'json\rejected_candidates_{job_title}.json', 'w') as f:
-        json.dump(rejected_candidates, f, indent=4)
-
-    return selected_candidates, rejected_candidates
+                    if group is not None:
+                        groups[id(candidate)] = group
+                        followers[group] = []
+                    representatives.append(candidate)
+            candidates_to_process = representatives
+            sent_to_llm += len(candidates_to_process)
+
+            if batch_size > 1:
+                batches = chunked(candidates_to_process, batch_size)
+                await asyncio.gather(*(process_batch(batch) for batch in batches))
+            else:
+                await asyncio.gather(*(process(candidate) for candidate in candidates_to_process))
+        if prescreen:
+            logger.info("Pre-screen finished", extra={'auto_rejected': auto_rejected_total, 'sent_to_llm': sent_to_llm})
+        if dedup.avoided['evaluate']:
+            logger.info("Duplicate applications evaluated once", extra={'llm_calls_avoided': dedup.avoided['evaluate']})
+        if dead_letters.entries:
+            logger.warning("Failed candidates kept for replay", extra={'path': dead_letters.path, 'failed': len(dead_letters.entries), **dead_letters.counts()})
+        journal.compact()
+        logger.info("Evaluation cache", extra=cache.stats())
+        logger.info("Profile tokens", extra={'job_title': job_title, **renderer.stats()})
+
+    return save_results(journal, job_title)
+
+def results_path(job_title, status):
+    return records_path(f"{status}_candidates_{job_title}")
+
+def save_results(journal, job_title):
+    """Streams the journal's selected and rejected results to their files; returns both counts."""
+    selected_count = write_records(results_path(job_title, 'selected'), journal.results('selected'))
+    rejected_count = write_records(results_path(job_title, 'rejected'), journal.results('rejected'))
+    return selected_count, rejected_count
+
+def evaluate_candidates(job_description, detailed_applications, job_title, concurrency=EVALUATION_CONCURRENCY, bypass_cache=CACHE_BYPASS, prescreen=PRESCREEN_ENABLED, batch_size=EVALUATION_BATCH_SIZE, llm=None):
+    return asyncio.run(evaluate_candidates_async(job_description, detailed_applications, job_title, concurrency, bypass_cache, prescreen, batch_size, llm))
+
+async def evaluate_jobs_async(jobs, detailed_paths, concurrency=EVALUATION_CONCURRENCY, bypass_cache=CACHE_BYPASS, prescreen=PRESCREEN_ENABLED, batch_size=EVALUATION_BATCH_SIZE, llm=None):
+    """Evaluates several openings at once under one LLM concurrency budget.
+
+    detailed_paths maps job ID to its detailed candidates file, as returned by
+    main_applicants_batch. Returns {job_id: (selected, rejected)} counts.
+    Openings that share a title share a journal and result files, so those
+    run one after another.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    title_locks = {job['Posting_Title']: asyncio.Lock() for job in jobs}
+
+    async def evaluate_job(job):
+        async with title_locks[job['Posting_Title']]:
+            return await evaluate_candidates_async(
+                job.get("Job_Description", ""), read_detailed_applications(detailed_paths[str(job['id'])]), job['Posting_Title'],
+                concurrency, bypass_cache, prescreen, batch_size, llm, semaphore
+            )
+
+    results = await asyncio.gather(*(evaluate_job(job) for job in jobs))
+    return {str(job['id']): result for job, result in zip(jobs, results)}
+
+async def replay_failed_evaluations_async(job_description, job_title, concurrency=EVALUATION_CONCURRENCY, bypass_cache=CACHE_BYPASS, llm=None, semaphore=None):
+    """Re-evaluates only the candidates in the job's dead-letter store.
+
+    Entries run concurrently, each after the backoff for its error class.
+    Successes are resolved and added to the result files; if a run for the
+    title is still unfinished they go to its journal instead, so its
+    save_results picks them up. Returns (resolved, still_failed).
+    """
+    dead_letters = DeadLetterStore(evaluation_dead_letter_path(job_title), 'evaluate')
+    dead_letters.load()
+    entries = dead_letters.pending()
+    if not entries:
+        return 0, 0
+
+    journal = EvaluationJournal(journal_path(job_title))
+    unfinished = bool(journal.replay())
+    chain = build_evaluation_chain(job_title, llm)
+    semaphore = semaphore or asyncio.Semaphore(concurrency)
+    cache = EvaluationCache(bypass=bypass_cache)
+    cache_context = evaluation_cache_context(job_title)
+    results = {'selected': [], 'rejected': []}
+    await asyncio.to_thread(load_encoding)
+
+    async def replay(entry):
+        candidate = Application.from_zoho(entry['payload'], entry['payload'])
+        try:
+            evaluation = await evaluate_candidate(chain, job_description, candidate, semaphore, cache, cache_context)
+        except Exception as e:
+            record_failure(journal, dead_letters, candidate, e, job_title)
+            return False
+        if unfinished:
+            record_evaluation(journal, candidate, evaluation, job_title)
+        else:
+            CANDIDATES_EVALUATED.inc(status=evaluation_status(evaluation))
+            results[evaluation_status(evaluation)].append(build_candidate_result(candidate, evaluation, job_title))
+        dead_letters.resolve(application_key(candidate))
+        return True
+
+    with dead_letters, journal, cache:
+        logger.info("Replaying failed candidates", extra={'job_title': job_title, 'candidates': len(entries), **dead_letters.counts()})
+        # The semaphore inside evaluate_candidate bounds LLM calls; replay_entries only staggers the starts
+        resolved, failed = await replay_entries(entries, replay, len(entries), 'evaluate')
+        dead_letters.compact()
+        if unfinished:
+            journal.compact()
+        else:
+            # The journal only existed to satisfy record_failure; a finished run has none
+            journal.remove()
+
+    for status, new_results in results.items():
+        path = results_path(job_title, status)
+        if new_results:
+            existing = read_records(path) if os.path.exists(path) else ()
+            write_records(path, itertools.chain(existing, new_results))
+    return resolved, failed
+
+def replay_failed(job_ids=None):
+    """Replays the dead-letter stores of the given openings, or every in-progress one."""
+    configure_logging()
+    metrics.start_writer()
+
+    # Openings that share a title share a dead-letter store, so each title is replayed once
+    jobs = list({job['Posting_Title']: job for job in select_jobs(fetch_job_openings() or [], job_ids)}.values())
+    semaphore = asyncio.Semaphore(EVALUATION_CONCURRENCY)
+
+    async def replay_jobs():
+        return await asyncio.gather(*(
+            replay_failed_evaluations_async(job.get("Job_Description", ""), job['Posting_Title'], semaphore=semaphore)
+            for job in jobs
+        ))
+
+    for job, (resolved, failed) in zip(jobs, asyncio.run(replay_jobs())):
+        logger.info("Replay finished", extra={'job_title': job['Posting_Title'], 'resolved': resolved, 'still_failed': failed})
+    metrics.log_summary()
+
+def main_batch(job_ids=None):
+    """Screens the given openings, or every in-progress one, without prompting."""
+    configure_logging()
+    metrics.start_writer()
+
+    jobs, detailed_paths = main_applicants_batch(job_ids)
+    results = asyncio.run(evaluate_jobs_async(jobs, detailed_paths))
+
+    for job in jobs:
+        selected, rejected = results[str(job['id'])]
+        logger.info("Evaluation finished", extra={'job_title': job['Posting_Title'], 'selected': selected, 'rejected': rejected})
+        EvaluationJournal(journal_path(job['Posting_Title'])).remove()
+    metrics.log_summary()
 
 def main():
+    configure_logging()
+    metrics.start_writer()
 
-    job_description, detailed_applications, job_title = main_applicants()
+    job_description, detailed_path, job_title = main_applicants()
 
     # job_description = """Company: Tarini Consulting  Location: Remote (India)  Experience Level: 6-8 Years  Salary Range: ₹14-15 LPA(in hand) ​  Are you a talented Laravel Developer with a diverse experience in crafting elegant and efficient web solutions? Tarini Consulting, a leading IT company, is on the lookout for Remote Laravel Developers to join our dynamic team.   Key Responsibilities: Lead the development team to design and implement and improve Laravel-based web applications. Develop, test, and maintain robust and scalable code following best practices. Troubleshoot, debug, and upgrade existing systems for optimal performance. Work closely with front-end developers to integrate user-facing elements with server-side logic. Stay updated on Laravel framework updates and industry best practices. Contribute to the planning and execution of software projects.   Requirements Bachelor’s degree in Computer Science, IT, or a related field. 6-8 Years experience in PHP Laravel Framework Familiarity with front-end technologies such as HTML, CSS, and JavaScript. Knowledge of database design and management using MySQL. Strong problem-solving and analytical skills. Ability to work independently and collaboratively in a remote team environment.   Benefits Competitive salary Opportunity to work remotely and enjoy a flexible work environment. Engage with cutting-edge technologies in a collaborative work culture. Contribute to innovative projects and be a part of a forward-thinking IT company. If you have a passion for web development and want to be part of a thriving IT community, we invite you to apply.  Tarini Consulting is an equal opportunity employer and encourages applicants from diverse backgrounds.   *Note: This is a remote position, and applicants must be based in India."""
-    # Load candidates from JSON file
-    # with open(r'json\detailed_candidates.json'r, 'r') as file:
-    #     detailed_applications = json.load(file)
-    
-    # Evaluate candidates
-    selected, rejected = evaluate_candidates(job_description, detailed_applications, job_title)
+    # Candidates are streamed from the file main_applicants wrote
+    selected, rejected = evaluate_candidates(job_description, read_detailed_applications(detailed_path), job_title)
 
-    print(f"Selected Candidates ({job_title}): {len(selected)}")
-    print(f"Rejected Candidates ({job_title}): {len(rejected)}")
-    os.remove(os.path.join('json', f'evaluation_progress_{job_title}.json'))
+    logger.info("Evaluation finished", extra={'job_title': job_title, 'selected': selected, 'rejected': rejected})
+    EvaluationJournal(journal_path(job_title)).remove()
+    metrics.log_summary()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Screen Zoho Recruit applicants with the LLM.")
+    parser.add_argument('--all-jobs', action='store_true', help="screen every in-progress opening without prompting")
+    parser.add_argument('--job-id', action='append', dest='job_ids', help="screen this opening without prompting; repeatable")
+    parser.add_argument('--replay-failed', action='store_true', help="re-evaluate only the candidates that failed in earlier runs")
+    args = parser.parse_args()
+    if args.replay_failed:
+        replay_failed(args.job_ids)
+    elif args.all_jobs or args.job_ids:
+        main_batch(args.job_ids)
+    else:
+        main()
\ No newline at end of file
@@ -1,24 +1,36 @@
-import requests
-from auth.zoho_auth import get_access_token
-import json
-import sys
-import time
+from zoho_client import get_zoho_client
+from candidate_store import CandidateStore
+from instrumentation import metrics, configure_logging
+from record_io import chunked, read_records, records_path, write_records
+from zoho_records import Application, Candidate
+from candidate_dedup import CANDIDATES_DEDUPLICATED
+import logging
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-BASE_URL = "https://recruit.zoho.in/recruit/v2/"
 JOB_OPENINGS_ENDPOINT = "JobOpenings"
 APPLICATIONS_ENDPOINT = "Applications"
 CANDIDATES_ENDPOINT = "Candidates"
+PAGE_FETCH_CONCURRENCY = 4
+HYDRATION_CONCURRENCY = 8
+CANDIDATE_BATCH_SIZE = 50
+SYNC_OVERLAP_SECONDS = 300
+# Applications merged with their candidates per store round trip while streaming
+MERGE_CHUNK_SIZE = 500
+
+# Set once Zoho answers a projected Applications page without $Candidate_Id; later pages skip `fields`
+_unprojected_applications = False
+
+logger = logging.getLogger(__name__)
 
 # Fetch Job Openings
 def fetch_job_openings():
-    access_token = get_access_token()
-    headers = {"Authorization": f"Zoho-oauthtoken {access_token}"}
-    response = requests.get(f"{BASE_URL}{JOB_OPENINGS_ENDPOINT}", headers=headers)
+    response = get_zoho_client().get(JOB_OPENINGS_ENDPOINT)
     
     if response.status_code == 200:
         return response.json().get("data", [])
     else:
-        print(f"Failed to fetch job openings: {response.text}")
+        logger.error("Failed to fetch job openings", extra={'status': response.status_code, 'response': response.text})
         return None
 
 # get in-progress job
@@ -38,120 +50,470 @@ def select_job_title(job_openings):
     return job_openings[choice - 1] if 1 <= choice <= len(job_openings) else None
 
 
-def get_all_applications():
-    access_token = get_access_token()
-    headers = {"Authorization": f"Zoho-oauthtoken {access_token}"}
+def projected(record_type, params=None):
+    """Adds Zoho's `fields` parameter so only the fields record_type keeps are sent."""
+    fields = record_type.fields_param()
+    return {**(params or {}), "fields": fields} if fields else params
+
+
+def modified_since_headers(modified_since):
+    return {"If-Modified-Since": modified_since} if modified_since else None
+
+
+def is_applications_endpoint(endpoint):
+    return APPLICATIONS_ENDPOINT in endpoint.split("/")
+
+
+def fetch_application_page(endpoint, page, per_page=200, params=None, modified_since=None):
+    global _unprojected_applications
+    params = {**(params or {}), "page": page, "per_page": per_page}
+    if _unprojected_applications and is_applications_endpoint(endpoint):
+        params.pop("fields", None)
+    response = get_zoho_client().get(endpoint, params=params, headers=modified_since_headers(modified_since))
+
+    if response.status_code == 200:
+        body = response.json()
+        data = body.get("data", [])
+        # Applications without $Candidate_Id are all dropped downstream, so don't trust the projection
+        if data and "fields" in params and is_applications_endpoint(endpoint) and not any(app.get("$Candidate_Id") for app in data):
+            logger.warning("Projected applications came back without $Candidate_Id, re-requesting without fields", extra={'endpoint': endpoint, 'page': page})
+            _unprojected_applications = True
+            return fetch_application_page(endpoint, page, per_page, params, modified_since)
+        return data, body.get("info", {}).get("more_records", True)
+    elif response.status_code in (204, 304):
+        return [], False
+    else:
+        raise RuntimeError(f"Failed to fetch page {page} of {endpoint}: {response.status_code} {response.text}")
+
+
+def fetch_all_pages(endpoint, params=None, per_page=200, modified_since=None):
+    records = []
+    page = 1
+    while True:
+        data, more_records = fetch_application_page(endpoint, page, per_page, params, modified_since)
+        records.extend(data)
+        if not data or not more_records:
+            return records
+        page += 1
+
+
+def get_all_applications(max_workers=PAGE_FETCH_CONCURRENCY, modified_since=None):
+    """Full scan of the Applications module, fetching up to max_workers pages at once.
+
+    Raises RuntimeError if any page fails after the client's retries, so a
+    partial scan is never mistaken for a complete one and no sync watermark
+    moves past the pages that were missed.
+    """
     all_applications = []
     page = 1
     per_page = 200
 
-    while True:
-        params = {"page": page, "per_page": per_page}
-        response = requests.get(f"{BASE_URL}{APPLICATIONS_ENDPOINT}", headers=headers, params=params)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            pages = range(page, page + max_workers)
+            futures = [
+                executor.submit(fetch_application_page, APPLICATIONS_ENDPOINT, p, per_page, projected(Application), modified_since)
+                for p in pages
+            ]
 
-        if response.status_code == 200:
-            data = response.json().get("data", [])
-            if not data:
+            # Consume the window in page order and stop at the first short or empty page
+            done = False
+            for p, future in zip(pages, futures):
+                try:
+                    data, more_records = future.result()
+                except RuntimeError as e:
+                    logger.error("Application scan failed", extra={'page': p, 'error': str(e)})
+                    raise
+                all_applications.extend(data)
+                logger.debug("Fetched application page", extra={'page': p, 'applications': len(data)})
+                if not data or not more_records:
+                    done = True
+                    break
+
+            if done:
                 break
-            all_applications.extend(data)
-            sys.stdout.write(f"\rFetched {len(data)} applications from page {page}               ")  
-            sys.stdout.flush()
-            page += 1
-        elif response.status_code == 204:
-            print(f"\nNo applications found on page {page}")
-            break
-        else:
-            print(f"\nFailed to fetch applications on page {page}: {response}")
-            break
+            page += max_workers
 
-    print()
     return all_applications
 
 
-def filter_applications_by_job(job_title):
-    applications = get_all_applications()
-    print(f"Total applications: {len(applications)}")
+def fetch_job_applications(job_id, job_title, modified_since=None):
+    """Asks Zoho for only the applications of one job opening.
+
+    Tries the job opening's related Applications list first and falls back
+    to a module search; returns None if neither endpoint is usable. With
+    modified_since, only records changed after that ISO timestamp come back.
+    """
+    try:
+        return fetch_all_pages(
+            f"{JOB_OPENINGS_ENDPOINT}/{job_id}/{APPLICATIONS_ENDPOINT}", projected(Application), modified_since=modified_since
+        )
+    except RuntimeError as e:
+        logger.warning("Related-records lookup failed, trying search", extra={'error': str(e)})
+
+    try:
+        criteria = f"(Posting_Title:equals:{job_title})"
+        return fetch_all_pages(f"{APPLICATIONS_ENDPOINT}/search", projected(Application, {"criteria": criteria}), modified_since=modified_since)
+    except RuntimeError as e:
+        logger.warning("Application search failed", extra={'error': str(e)})
+    return None
+
+
+def filter_applications_by_job(job_title, job_id=None, modified_since=None):
+    if job_id:
+        applications = fetch_job_applications(job_id, job_title, modified_since)
+        if applications is not None:
+            return applications
+
+    # Fall back to a full scan and filter client-side
+    applications = get_all_applications(modified_since=modified_since)
+    logger.info("Scanned all applications", extra={'applications': len(applications)})
     filtered_apps = [
         app for app in applications if app.get("Posting_Title", {}) == job_title
     ]
     return filtered_apps
 
-def reset_timer():
-    print("\nAPI limit reached. Waiting for reset...")
-    for i in range(60, 0, -1):
-        sys.stdout.write(f"\rRetrying in {i} seconds...")
-        sys.stdout.flush()
-        time.sleep(1)
-    print("\nRetrying now.")
-
 # Fetch detailed candidate information
 def fetch_candidate_details(candidate_id):
-    access_token = get_access_token()
-    headers = {"Authorization": f"Zoho-oauthtoken {access_token}"}
-    url = f"{BASE_URL}{CANDIDATES_ENDPOINT}/{candidate_id}"
+    response = get_zoho_client().get(f"{CANDIDATES_ENDPOINT}/{candidate_id}", params=projected(Candidate))
 
-    while True:
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            return response.json().get("data", {})
-        elif response.status_code == 429:
-            reset_timer()
-        else:
-            print(f"Failed to fetch candidate details for ID {candidate_id}: {response.text}")
-            return None
+    if response.status_code == 200:
+        return response.json().get("data", {})
+    else:
+        logger.warning("Failed to fetch candidate details", extra={'candidate_id': candidate_id, 'status': response.status_code, 'response': response.text})
+        return None
+
+
+async def fetch_candidate_details_async(candidate_id, client):
+    """Same contract as fetch_candidate_details, over an AsyncZohoClient."""
+    response = await client.get(f"{CANDIDATES_ENDPOINT}/{candidate_id}", params=projected(Candidate))
+
+    if response.status_code == 200:
+        return response.json().get("data", {})
+    else:
+        logger.warning("Failed to fetch candidate details", extra={'candidate_id': candidate_id, 'status': response.status_code, 'response': response.text})
+        return None
+
+
+def fetch_candidates_batch(candidate_ids):
+    """Fetches several candidates in one request; returns None if Zoho rejects the multi-ID form."""
+    response = get_zoho_client().get(CANDIDATES_ENDPOINT, params=projected(Candidate, {"ids": ",".join(candidate_ids)}))
+
+    if response.status_code == 200:
+        return {str(record["id"]): Candidate.from_zoho(record) for record in response.json().get("data", [])}
+    elif response.status_code == 204:
+        return {}
+    else:
+        return None
+
+
+def hydrate_candidates(candidate_ids, batch_size=CANDIDATE_BATCH_SIZE, max_workers=HYDRATION_CONCURRENCY):
+    """Fetches candidate records for the given IDs.
+
+    Uses multi-ID requests first and fans out single-record requests for
+    whatever a batch did not return. Returns (details, failures), both keyed
+    by candidate ID with Candidate records as details; a failing ID never
+    aborts the rest.
+    """
+    requested = [str(candidate_id) for candidate_id in candidate_ids]
+    candidate_ids = list(dict.fromkeys(requested))
+    if len(requested) > len(candidate_ids):
+        CANDIDATES_DEDUPLICATED.inc(len(requested) - len(candidate_ids), stage='fetch')
+    details = {}
+    failures = {}
+
+    def fetch_batch(batch):
+        try:
+            return fetch_candidates_batch(batch)
+        except Exception as e:
+            # The batch's IDs are left for the single-record fallback below
+            logger.warning("Candidate batch failed, retrying its IDs one by one", extra={'candidates': len(batch), 'error': str(e)})
+            return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if batch_size > 1:
+            batches = [candidate_ids[i:i + batch_size] for i in range(0, len(candidate_ids), batch_size)]
+            for batch, records in zip(batches, executor.map(fetch_batch, batches)):
+                if records is None:
+                    # Multi-ID reads unsupported; everything goes through the single-record path
+                    break
+                details.update(records)
+                logger.debug("Hydration progress", extra={'hydrated': len(details), 'total': len(candidate_ids)})
+
+        remaining = [candidate_id for candidate_id in candidate_ids if candidate_id not in details]
+        futures = {
+            executor.submit(fetch_candidate_details, candidate_id): candidate_id
+            for candidate_id in remaining
+        }
+        for future in as_completed(futures):
+            candidate_id = futures[future]
+            try:
+                records = future.result()
+            except Exception as e:
+                failures[candidate_id] = str(e)
+                continue
+            if records:
+                details[candidate_id] = Candidate.from_zoho(records[0])
+            else:
+                failures[candidate_id] = "No candidate record returned"
+            logger.debug("Hydration progress", extra={'hydrated': len(details), 'total': len(candidate_ids)})
+
+    return details, failures
 
 
 # Get more details for each candidate in the applications
 def fetch_detailed_applications(applications):
+    candidate_ids = [app["$Candidate_Id"] for app in applications if app.get("$Candidate_Id")]
+    details, failures = hydrate_candidates(candidate_ids)
+
     detailed_apps = []
-    for idx, app in enumerate(applications, 1):
+    for app in applications:
         candidate_id = app.get("$Candidate_Id")
         if not candidate_id:
             continue
 
-        print(f"\nFetching details for Candidate {idx}/{len(applications)} - ID: {candidate_id}")
-        details = fetch_candidate_details(candidate_id)
-        if details:
-            # Merge basic app data with detailed candidate data
-            app.update(details[0])
-            detailed_apps.append(app)
-        else:
-            print(f"Skipping candidate ID {candidate_id} due to failure.")
+        if str(candidate_id) in details:
+            # Attach the detailed candidate to the basic app data
+            detailed_apps.append(Application.from_zoho(app, details[str(candidate_id)]))
+
+    for candidate_id, reason in failures.items():
+        logger.warning("Skipping candidate", extra={'candidate_id': candidate_id, 'reason': reason})
     
     return detailed_apps
 
 
-# Main Execution
-def main_applicants():
+def fetch_modified_candidate_ids(modified_since):
+    """IDs of every candidate changed in Zoho after modified_since."""
+    # Only IDs are needed; one small field keeps the pages light
+    params = {"fields": "Modified_Time"} if Candidate.fields_param() else None
+    records = fetch_all_pages(CANDIDATES_ENDPOINT, params, modified_since=modified_since)
+    return {str(record["id"]) for record in records}
+
+
+def sync_timestamp():
+    # Overlap the next window slightly so clock skew with Zoho can't drop an edit
+    started = datetime.now(timezone.utc) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+    return started.replace(microsecond=0).isoformat()
+
+
+def stale_candidate_ids(store, candidate_ids, changed_apps, candidate_since):
+    """Candidates that are new, belong to a changed application, or were edited in Zoho since candidate_since."""
+    stale_ids = {str(app["$Candidate_Id"]) for app in changed_apps if app.get("$Candidate_Id")}
+    stale_ids |= candidate_ids - store.existing_candidate_ids(candidate_ids)
+    if candidate_since:
+        try:
+            stale_ids |= candidate_ids & fetch_modified_candidate_ids(candidate_since)
+        except RuntimeError as e:
+            logger.warning("Could not list modified candidates, refreshing all", extra={'error': str(e)})
+            stale_ids = set(candidate_ids)
+    return stale_ids
+
+
+def refresh_candidates(store, stale_ids, application_counts):
+    """Hydrates stale_ids once each, however many of the applications share them; returns the failures."""
+    fetches_avoided = sum(application_counts.get(candidate_id, 1) - 1 for candidate_id in stale_ids)
+    if fetches_avoided:
+        CANDIDATES_DEDUPLICATED.inc(fetches_avoided, stage='fetch')
+    logger.info("Hydrating candidates", extra={'stale': len(stale_ids), 'total': len(application_counts), 'fetches_avoided': fetches_avoided})
+    details, failures = hydrate_candidates(stale_ids)
+    store.upsert_candidates(details)
+    for candidate_id, reason in failures.items():
+        logger.warning("Skipping candidate", extra={'candidate_id': candidate_id, 'reason': reason})
+    return failures
+
+
+def merge_candidate_details(applications, candidates):
+    for app in applications:
+        candidate_id = str(app.get("$Candidate_Id") or "")
+        if candidate_id in candidates:
+            # Attach the detailed candidate to the basic app data
+            app.candidate = candidates[candidate_id]
+            yield app
+
+
+def iter_detailed_applications(store, job_id, chunk_size=MERGE_CHUNK_SIZE):
+    """Streams a job's detailed applications from the store, chunk_size at a time."""
+    for applications in chunked(store.iter_applications(job_id), chunk_size):
+        candidate_ids = {str(app["$Candidate_Id"]) for app in applications if app.get("$Candidate_Id")}
+        yield from merge_candidate_details(applications, store.get_candidates(candidate_ids))
+
+
+def sync_detailed_applications(store, job_id, job_title):
+    """Brings the local store up to date for one job and returns an iterator over its detailed applications.
+
+    Only applications created or modified since the job's watermark are
+    downloaded, and only candidates that are new, belong to a changed
+    application, or were edited in Zoho since the last sync are re-hydrated.
+    A failed application lookup raises before the watermark is moved, so the
+    next sync asks for the same window again; likewise the candidate
+    watermark stays put while any candidate failed to re-hydrate, so an edit
+    that could not be fetched is picked up next time. The iterator reads from
+    `store`, so consume it before closing the store.
+    """
+    app_scope = f"applications:{job_id}"
+    candidate_scope = f"candidates:{job_id}"
+    app_since = store.get_watermark(app_scope)
+    candidate_since = store.get_watermark(candidate_scope)
+    sync_started = sync_timestamp()
+
+    changed_apps = filter_applications_by_job(job_title, job_id, modified_since=app_since)
+    store.upsert_applications(changed_apps, job_id)
+    store.set_watermark(app_scope, sync_started)
+    logger.info("Synced applications", extra={'changed': len(changed_apps), 'since': app_since or 'first sync'})
+
+    application_counts = store.candidate_application_counts([job_id])
+    candidate_ids = set(application_counts)
+
+    stale_ids = stale_candidate_ids(store, candidate_ids, changed_apps, candidate_since)
+    if refresh_candidates(store, stale_ids, application_counts):
+        logger.warning("Candidate watermark not advanced", extra={'scope': candidate_scope})
+    else:
+        store.set_watermark(candidate_scope, sync_started)
+
+    return iter_detailed_applications(store, job_id)
+
+
+def index_applications_by_job(applications, jobs):
+    """Groups one Applications scan by job opening ID.
+
+    Applications are matched on Posting_Title as in filter_applications_by_job;
+    openings sharing a title each get every matching application.
+    """
+    job_ids_by_title = {}
+    for job in jobs:
+        job_ids_by_title.setdefault(job['Posting_Title'], []).append(str(job['id']))
+    index = {str(job['id']): [] for job in jobs}
+    for app in applications:
+        for job_id in job_ids_by_title.get(app.get("Posting_Title"), []):
+            index[job_id].append(app)
+    return index
+
+
+def earliest_watermark(store, scopes):
+    """Oldest watermark across scopes, or None if any scope has never been synced."""
+    watermarks = [store.get_watermark(scope) for scope in scopes]
+    return None if None in watermarks else min(watermarks)
+
+
+def sync_jobs_detailed_applications(store, jobs):
+    """Multi-job sync: returns {job_id: detailed applications iterator} for every job in `jobs`.
+
+    Scans the Applications module once for all jobs, indexes the result by
+    job ID, and hydrates each stale candidate once even if they applied to
+    several of the jobs. Watermarks stay per job, so this and
+    sync_detailed_applications can be used interchangeably; as there, a
+    failed scan raises before any watermark moves, and candidate watermarks
+    only move when every stale candidate was re-hydrated.
+    """
+    job_ids = [str(job['id']) for job in jobs]
+    app_since = earliest_watermark(store, [f"applications:{job_id}" for job_id in job_ids])
+    candidate_since = earliest_watermark(store, [f"candidates:{job_id}" for job_id in job_ids])
+    sync_started = sync_timestamp()
+
+    index = index_applications_by_job(get_all_applications(modified_since=app_since), jobs)
+    changed_apps = []
+    for job_id, apps in index.items():
+        store.upsert_applications(apps, job_id)
+        store.set_watermark(f"applications:{job_id}", sync_started)
+        changed_apps += apps
+    logger.info("Synced applications", extra={'jobs': len(job_ids), 'changed': len(changed_apps), 'since': app_since or 'first sync'})
+
+    application_counts = store.candidate_application_counts(job_ids)
+    candidate_ids = set(application_counts)
+
+    stale_ids = stale_candidate_ids(store, candidate_ids, changed_apps, candidate_since)
+    if refresh_candidates(store, stale_ids, application_counts):
+        logger.warning("Candidate watermarks not advanced", extra={'jobs': len(job_ids)})
+    else:
+        for job_id in job_ids:
+            store.set_watermark(f"candidates:{job_id}", sync_started)
+
+    return {job_id: iter_detailed_applications(store, job_id) for job_id in job_ids}
+
+
+def choose_job():
     job_openings = fetch_job_openings()
     if not job_openings:
-        return
+        return None
     
     in_progress_openings = get_in_progress_job_openings(job_openings)
     if not in_progress_openings:
-        return
+        return None
+
+    return select_job_title(in_progress_openings)
+
+
+def select_jobs(job_openings, job_ids=None):
+    """The openings with the given IDs, or every in-progress opening when job_ids is empty."""
+    if job_ids:
+        wanted = {str(job_id) for job_id in job_ids}
+        return [job for job in job_openings if str(job['id']) in wanted]
+    return get_in_progress_job_openings(job_openings)
+
+
+def detailed_candidates_path(job_title):
+    return records_path(f"detailed_candidates_{job_title}")
+
+
+def read_detailed_applications(path):
+    """Streams a detailed candidates file back as Application records."""
+    return (Application.from_zoho(record, record) for record in read_records(path))
+
 
-    selected_job = select_job_title(in_progress_openings)
+def save_detailed_applications(job_title, detailed_applications):
+    """Streams detailed applications to the job's record file; returns (path, count)."""
+    path = detailed_candidates_path(job_title)
+    count = write_records(path, detailed_applications)
+    logger.info("Saved detailed candidates", extra={'job_title': job_title, 'candidates': count, 'path': path})
+    return path, count
+
+
+def main_applicants_batch(job_ids=None):
+    """Non-interactive sync of several openings; returns (jobs, {job_id: detailed candidates file})."""
+    job_openings = fetch_job_openings()
+    if not job_openings:
+        return [], {}
+
+    jobs = select_jobs(job_openings, job_ids)
+    if job_ids and len(jobs) < len(set(map(str, job_ids))):
+        found = {str(job['id']) for job in jobs}
+        logger.warning("Unknown job IDs", extra={'job_ids': sorted(set(map(str, job_ids)) - found)})
+    if not jobs:
+        return [], {}
+
+    logger.info("Syncing candidates", extra={'job_titles': [job['Posting_Title'] for job in jobs]})
+    with CandidateStore() as store:
+        if len(jobs) == 1:
+            # One job is cheaper through the server-side filtered lookup than a full scan
+            job = jobs[0]
+            detailed_by_job = {str(job['id']): sync_detailed_applications(store, job['id'], job['Posting_Title'])}
+        else:
+            detailed_by_job = sync_jobs_detailed_applications(store, jobs)
+
+        detailed_paths = {}
+        for job in jobs:
+            path, _ = save_detailed_applications(job['Posting_Title'], detailed_by_job[str(job['id'])])
+            detailed_paths[str(job['id'])] = path
+    return jobs, detailed_paths
+
+
+# Main Execution
+def main_applicants():
+    selected_job = choose_job()
     if not selected_job:
         return
     
     job_title = selected_job['Posting_Title']
     job_description = selected_job.get("Job_Description", "")
     # print(job_description)
-    print(f"\nFetching candidates for: {selected_job['Posting_Title']}...")
-    applications = filter_applications_by_job(job_title)
-    print(f"Found {len(applications)} applications for Job: {job_title}")
-
-    print("\nFetching detailed information for each candidate...")
-    detailed_applications = fetch_detailed_applications(applications)
-    print(f"\nSuccessfully fetched detailed info for {len(detailed_applications)} candidates.")
-
-    with open(rf"json\detailed_candidates_{job_title}.json", "w") as file:
-        json.dump(detailed_applications, file, indent=4)
-        print(f"\nSaved detailed data to 'detailed_candidates_{job_title}.json'.")
+    logger.info("Syncing candidates", extra={'job_title': job_title})
+    with CandidateStore() as store:
+        detailed_applications = sync_detailed_applications(store, selected_job['id'], job_title)
+        path, _ = save_detailed_applications(job_title, detailed_applications)
 
-    return job_description, detailed_applications, job_title
+    return job_description, path, job_title
 
 if __name__ == "__main__":
-    main_applicants()
\ No newline at end of file
+    configure_logging()
+    main_applicants()
+    metrics.log_summary()
\ No newline at end of file
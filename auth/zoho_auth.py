@@ -1,14 +1,28 @@
 import os
 import time
-import requests
+import asyncio
+import threading
+import logging
 import json
 from dotenv import load_dotenv
+from instrumentation import metrics
 TOKEN_FILE = r"auth\zoho_tokens.json"
 load_dotenv()
 CLIENT_ID = os.getenv("ZOHO_CLIENT_ID")
 CLIENT_SECRET = os.getenv("ZOHO_CLIENT_SECRET")
 REFRESH_TOKEN = os.getenv("ZOHO_REFRESH_TOKEN")
 TOKEN_URL = "https://accounts.zoho.in/oauth/v2/token"
+# Refresh in the background this many seconds before the cached token expires
+REFRESH_AHEAD = 300
+
+logger = logging.getLogger(__name__)
+TOKEN_REFRESHES = metrics.counter("zoho_token_refreshes_total", "Zoho OAuth token refreshes by outcome")
+TOKEN_REFRESH_SECONDS = metrics.histogram("zoho_token_refresh_seconds", "Zoho OAuth token refresh latency")
+
+# The file is only read once per process; afterwards the token lives here
+_tokens = None
+_lock = threading.Lock()
+_refresh_timer = None
 
 def read_tokens():
     if os.path.exists(TOKEN_FILE):
@@ -20,28 +34,76 @@ def write_tokens(data):
     with open(TOKEN_FILE, "w") as file:
         json.dump(data, file)
 
-def get_access_token():
-    tokens = read_tokens()
-    
-    if tokens.get("access_token") and time.time() < tokens.get("expires_at", 0):
-        return tokens["access_token"]
+def _is_valid(tokens):
+    return bool(tokens and tokens.get("access_token") and time.time() < tokens.get("expires_at", 0))
 
-    response = requests.post(
-        TOKEN_URL,
-        data={
-            "refresh_token": REFRESH_TOKEN,
-            "client_id": CLIENT_ID,
-            "client_secret": CLIENT_SECRET,
-            "grant_type": "refresh_token",
-        },
-    )
+def _schedule_refresh(expires_at):
+    global _refresh_timer
+    if _refresh_timer:
+        _refresh_timer.cancel()
+    _refresh_timer = threading.Timer(max(expires_at - REFRESH_AHEAD - time.time(), 0), _refresh_in_background)
+    _refresh_timer.daemon = True
+    _refresh_timer.start()
+
+def _refresh_in_background():
+    with _lock:
+        # Another caller may have refreshed while the timer was pending
+        if _tokens and time.time() < _tokens.get("expires_at", 0) - REFRESH_AHEAD:
+            return
+        try:
+            _refresh_tokens()
+        except Exception as e:
+            logger.error("Background token refresh failed", extra={'error': str(e)})
+
+def _refresh_tokens():
+    """Must be called with _lock held."""
+    global _tokens
+    # Only needed once an hour at most; keeps requests off the startup path
+    import requests
+    with TOKEN_REFRESH_SECONDS.time():
+        response = requests.post(
+            TOKEN_URL,
+            data={
+                "refresh_token": REFRESH_TOKEN,
+                "client_id": CLIENT_ID,
+                "client_secret": CLIENT_SECRET,
+                "grant_type": "refresh_token",
+            },
+        )
 
     if response.status_code == 200:
+        TOKEN_REFRESHES.inc(outcome="success")
         new_tokens = response.json()
         # print(new_tokens)
-        new_tokens["expires_at"] = time.time() + new_tokens["expires_in"] - 60  
-        
+        new_tokens["expires_at"] = time.time() + new_tokens["expires_in"] - 60
+
+        _tokens = new_tokens
         write_tokens(new_tokens)
+        _schedule_refresh(new_tokens["expires_at"])
         return new_tokens["access_token"]
-    
+
+    TOKEN_REFRESHES.inc(outcome="failure")
     raise Exception(f"Failed to refresh access token: {response.text}")
+
+def get_access_token():
+    global _tokens
+    tokens = _tokens
+    if _is_valid(tokens):
+        return tokens["access_token"]
+
+    # Single flight: the first caller refreshes, the rest wait and reuse its token
+    with _lock:
+        if _tokens is None:
+            _tokens = read_tokens()
+            if _is_valid(_tokens):
+                _schedule_refresh(_tokens["expires_at"])
+        if _is_valid(_tokens):
+            return _tokens["access_token"]
+        return _refresh_tokens()
+
+async def get_access_token_async():
+    tokens = _tokens
+    if _is_valid(tokens):
+        return tokens["access_token"]
+    # Shares the thread lock, so tasks and threads join the same refresh
+    return await asyncio.to_thread(get_access_token)
@@ -0,0 +1,381 @@
+import re
+import json
+import time
+import random
+import asyncio
+import argparse
+import multiprocessing
+from aiohttp import web
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+# Shapes follow the fields the real code reads; values are synthetic
+JOB_ID = "900000000000001"
+JOB_TITLE = "Laravel Developer"
+JOB_DESCRIPTION = (
+    "Experience Level: 6-8 Years. We need a Laravel developer with PHP, MySQL, REST API, Redis, "
+    "Docker and some JavaScript, Vue or React for integrating front-end work."
+)
+SKILL_POOL = [
+    "PHP", "Laravel", "MySQL", "Redis", "REST API", "Docker", "JavaScript", "Vue.js", "React", "AWS",
+    "Java", "Spring", "Kotlin", "Photoshop", "Excel", "Salesforce",
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+SUMMARY = "Built and maintained customer facing web applications, owned deployments and on-call. " * 3
+
+
+def zoho_system_fields(index):
+    """Fields real Zoho records carry but nothing here reads; they make field projection measurable."""
+    user = {"name": "Recruiter One", "id": "300000000000001", "email": "recruiter@example.invalid"}
+    return {
+        "Owner": user, "Created_By": user, "Modified_By": user,
+        "Created_Time": "2024-06-01T10:00:00+05:30", "Last_Activity_Time": "2024-12-01T10:00:00+05:30",
+        "Source": "Job Portal", "Origin": "Portal", "Candidate_Status": "New", "Salutation": None,
+        "Street": f"{index} Example Street", "City": "Pune", "State": "Maharashtra", "Zip_Code": "411001", "Country": "India",
+        "Current_Employer": None, "Current_Salary": None, "Expected_Salary": None, "Highest_Qualification_Held": "B.Tech",
+        "Skype_ID": None, "Twitter": None, "LinkedIn__s": None, "Website": None, "Secondary_Email": None, "Fax": None,
+        "Is_Unqualified": False, "Is_Locked": False, "Rating": None, "Tag": [], "Associated_Tags": [],
+        "$approval": {"delegate": False, "approve": False, "reject": False, "resubmit": False},
+        "$editable": True, "$state": "save", "$process_flow": False, "$converted": False,
+        "$layout_id": {"name": "Standard", "id": "300000000000002"},
+    }
+
+
+def synthetic_candidate(index, rng):
+    first, last = f"Candidate{index}", f"Test{index % 97}"
+    roles = [
+        {
+            "Occupation": rng.choice(["Software Engineer", "Senior Developer", "Backend Developer", "Analyst"]),
+            "Company": rng.choice(COMPANIES),
+            "Work_Duration": {"from": f"{2010 + role * 3}-01", "to": f"{2013 + role * 3}-01"},
+            "I_currently_work_here": role == 0,
+            "Summary": SUMMARY,
+            "id": f"exp{index}_{role}",
+        }
+        for role in range(rng.randint(1, 5))
+    ]
+    return {
+        **zoho_system_fields(index),
+        "id": str(100000000000000 + index),
+        "First_Name": first,
+        "Last_Name": last,
+        "Full_Name": f"{first} {last}",
+        "Email": f"candidate{index}@example.invalid",
+        "Mobile": f"+1555{index:07d}",
+        "Current_Job_Title": roles[0]["Occupation"],
+        "Experience_in_Years": rng.randint(0, 15),
+        "Skill_Set": ", ".join(rng.sample(SKILL_POOL, rng.randint(2, 7))),
+        "Experience_Details": roles,
+        "Educational_Details": [{"Degree": "B.Tech", "Institute_School": "Example University", "Duration": {"from": "2006", "to": "2010"}}],
+        "Modified_Time": "2025-01-01T00:00:00+05:30",
+    }
+
+
+def synthetic_pool(size, seed=7, duplicate_rate=0.0):
+    """(job_opening, applications, candidates_by_id) for `size` applications to one job.
+
+    duplicate_rate is the fraction of applications that are re-applications
+    by an earlier candidate.
+    """
+    rng = random.Random(seed)
+    candidates = {}
+    candidate_ids = []
+    applications = []
+    for index in range(size):
+        if duplicate_rate and candidate_ids and rng.random() < duplicate_rate:
+            candidate = candidates[rng.choice(candidate_ids)]
+        else:
+            candidate = synthetic_candidate(index, rng)
+            candidates[candidate["id"]] = candidate
+            candidate_ids.append(candidate["id"])
+        applications.append({
+            **zoho_system_fields(index),
+            "id": str(200000000000000 + index),
+            "$Candidate_Id": candidate["id"],
+            "Posting_Title": JOB_TITLE,
+            "Application_Status": "New",
+            "Modified_Time": candidate["Modified_Time"],
+        })
+    job = {"id": JOB_ID, "Posting_Title": JOB_TITLE, "Job_Opening_Status": "In-progress", "Job_Description": JOB_DESCRIPTION}
+    return job, applications, candidates
+
+
+class FaultInjector:
+    """Latency, 429 and error injection shared by the fake services."""
+
+    def __init__(self, latency=0.05, jitter=0.5, rate_limit_rate=0.0, error_rate=0.0, seed=7):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        self.counts = {"requests": 0, "rate_limited": 0, "errors": 0}
+
+    async def delay(self):
+        self.counts["requests"] += 1
+        await asyncio.sleep(self.latency * (1 + self.rng.uniform(-self.jitter, self.jitter)))
+
+    def fault(self):
+        """None, 'rate_limited' or 'errors' for the current request."""
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            kind = "rate_limited"
+        elif roll < self.rate_limit_rate + self.error_rate:
+            kind = "errors"
+        else:
+            return None
+        self.counts[kind] += 1
+        return kind
+
+
+class FakeZoho:
+    """aiohttp stand-in for the Zoho Recruit v2 endpoints applicants.py uses."""
+
+    def __init__(self, faults, size=1000, seed=7):
+        self.faults = faults
+        self.load(size, seed)
+
+    def load(self, size, seed=7, duplicate_rate=0.0):
+        self.job, self.applications, self.candidates = synthetic_pool(size, seed, duplicate_rate)
+        self.candidate_list = list(self.candidates.values())
+        self.faults.reset()
+        self.response_bytes = 0
+
+    @staticmethod
+    def project(records, request):
+        """Applies Zoho's `fields` parameter; id and $-prefixed system fields always come back."""
+        fields = request.query.get("fields")
+        if not fields:
+            return records
+        keep = set(fields.split(","))
+        return [
+            {key: value for key, value in record.items() if key in keep or key == "id" or key.startswith("$")}
+            for record in records
+        ]
+
+    @classmethod
+    def page(cls, records, request):
+        page = int(request.query.get("page", 1))
+        per_page = int(request.query.get("per_page", 200))
+        data = cls.project(records[(page - 1) * per_page:page * per_page], request)
+        if not data:
+            return web.Response(status=204)
+        more_records = page * per_page < len(records)
+        return web.json_response({"data": data, "info": {"page": page, "per_page": per_page, "more_records": more_records}})
+
+    @web.middleware
+    async def inject_faults(self, request, handler):
+        if request.path.startswith("/__"):
+            return await handler(request)
+        await self.faults.delay()
+        fault = self.faults.fault()
+        if fault == "rate_limited":
+            return web.json_response({"code": "TOO_MANY_REQUESTS"}, status=429, headers={"Retry-After": "1"})
+        if fault == "errors":
+            return web.json_response({"code": "INTERNAL_ERROR"}, status=500)
+        response = await handler(request)
+        self.response_bytes += len(response.body or b"")
+        return response
+
+    async def handle_job_openings(self, request):
+        return web.json_response({"data": [self.job], "info": {"more_records": False}})
+
+    async def handle_applications(self, request):
+        if request.match_info.get("job_id", JOB_ID) != JOB_ID:
+            return web.Response(status=204)
+        return self.page(self.applications, request)
+
+    async def handle_candidates(self, request):
+        ids = request.query.get("ids")
+        if ids:
+            data = self.project([self.candidates[candidate_id] for candidate_id in ids.split(",") if candidate_id in self.candidates], request)
+            return web.json_response({"data": data}) if data else web.Response(status=204)
+        # Synthetic records never change after they are generated
+        if request.headers.get("If-Modified-Since"):
+            return web.Response(status=304)
+        return self.page(self.candidate_list, request)
+
+    async def handle_candidate(self, request):
+        candidate = self.candidates.get(request.match_info["candidate_id"])
+        return web.json_response({"data": self.project([candidate], request)}) if candidate else web.Response(status=204)
+
+    async def handle_reset(self, request):
+        body = await request.json()
+        self.load(int(body["size"]), int(body.get("seed", 7)), float(body.get("duplicate_rate", 0.0)))
+        return web.json_response({"size": len(self.applications)})
+
+    async def handle_stats(self, request):
+        return web.json_response({**self.faults.counts, "response_bytes": self.response_bytes})
+
+    def app(self):
+        app = web.Application(middlewares=[self.inject_faults])
+        app.router.add_get("/JobOpenings", self.handle_job_openings)
+        app.router.add_get("/JobOpenings/{job_id}/Applications", self.handle_applications)
+        app.router.add_get("/Applications", self.handle_applications)
+        app.router.add_get("/Applications/search", self.handle_applications)
+        app.router.add_get("/Candidates", self.handle_candidates)
+        app.router.add_get("/Candidates/{candidate_id}", self.handle_candidate)
+        app.router.add_post("/__reset", self.handle_reset)
+        app.router.add_get("/__stats", self.handle_stats)
+        return app
+
+
+def serve_zoho(port_queue, host="127.0.0.1", port=0, size=1000, seed=7, **fault_options):
+    async def run():
+        runner = web.AppRunner(FakeZoho(FaultInjector(seed=seed, **fault_options), size, seed).app())
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        port_queue.put(runner.addresses[0][1])
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def start_fake_zoho(**options):
+    """Runs FakeZoho in a child process so its allocations stay out of the measurements.
+
+    Returns (process, base_url); terminate the process when done.
+    """
+    context = multiprocessing.get_context("spawn")
+    port_queue = context.Queue()
+    process = context.Process(target=serve_zoho, args=(port_queue,), kwargs=options, daemon=True)
+    process.start()
+    return process, f"http://127.0.0.1:{port_queue.get(timeout=30)}/"
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+class FakeServerError(Exception):
+    status_code = 500
+
+
+def raise_fault(faults, service):
+    fault = faults.fault()
+    if fault == "rate_limited":
+        raise FakeRateLimitError(f"429 {service} rate limit exceeded")
+    if fault == "errors":
+        raise FakeServerError(f"500 {service} internal error")
+
+
+def fake_llm(faults, shortlist_rate=0.3, latencies=None):
+    """Chat-model stand-in that slots into build_evaluation_chain(llm=...).
+
+    Replies with the JSON the prompts ask for: one object, or an array keyed
+    by candidate_id when the prompt is a batch. The recommendation is a
+    stable function of the prompt so repeated runs agree.
+    """
+    async def respond(prompt_value):
+        started = time.perf_counter()
+        try:
+            await faults.delay()
+            raise_fault(faults, "Gemini")
+            text = prompt_value.to_string()
+            candidate_ids = re.findall(r"Candidate ID: (\S+)", text)
+
+            def evaluation(key):
+                shortlist = random.Random(key).random() < shortlist_rate
+                return {
+                    "score": 80 if shortlist else 35,
+                    "recommendation": "Shortlist" if shortlist else "Reject",
+                    "reasoning": "Synthetic evaluation",
+                    "strong_points": ["Laravel"] if shortlist else [],
+                    "areas_of_concern": [] if shortlist else ["Limited Laravel experience"],
+                }
+
+            if candidate_ids:
+                body = [{"candidate_id": key, **evaluation(key)} for key in candidate_ids]
+            else:
+                body = evaluation(text)
+            return AIMessage(content=json.dumps(body))
+        finally:
+            if latencies is not None:
+                latencies.append(time.perf_counter() - started)
+
+    return RunnableLambda(respond)
+
+
+class FakeCall:
+    def __init__(self, call_id, to_number, started_ms, duration):
+        self.call_id = call_id
+        self.to_number = to_number
+        self.call_type = "phone_call"
+        self.start_timestamp = started_ms
+        self.ends_at = time.monotonic() + duration
+        self.call_status = "registered"
+        self.call_analysis = None
+        self.transcript = None
+        self.recording_url = None
+
+    def refresh(self):
+        if time.monotonic() >= self.ends_at:
+            self.call_status = "ended"
+            self.transcript = "Agent: Hi, is this a good time to talk?\nUser: Yes."
+            self.recording_url = f"https://example.invalid/recordings/{self.call_id}.wav"
+            self.call_analysis = {"custom_analysis_data": {
+                "has_laptop": True, "expected_salary": "15 LPA", "notice_period": "30 days", "working_hours": "Flexible",
+            }}
+        else:
+            self.call_status = "ongoing"
+        return self
+
+    def model_dump(self):
+        return {key: value for key, value in vars(self).items() if key != "ends_at"}
+
+
+class FakeCallApi:
+    def __init__(self, faults, call_seconds):
+        self.faults = faults
+        self.call_seconds = call_seconds
+        self.calls = {}
+        self.dialled = {}
+
+    async def create_phone_call(self, to_number, from_number=None, retell_llm_dynamic_variables=None):
+        await self.faults.delay()
+        raise_fault(self.faults, "Retell")
+        call = FakeCall(f"call_{len(self.calls)}", to_number, int(time.time() * 1000), self.call_seconds)
+        self.calls[call.call_id] = call
+        self.dialled[to_number] = time.perf_counter()
+        return call
+
+    async def retrieve(self, call_id):
+        await self.faults.delay()
+        raise_fault(self.faults, "Retell")
+        return self.calls[call_id].refresh()
+
+    async def list(self, filter_criteria=None, limit=1000, sort_order="descending", pagination_key=None):
+        await self.faults.delay()
+        raise_fault(self.faults, "Retell")
+        lower = ((filter_criteria or {}).get("start_timestamp") or {}).get("lower_threshold", 0)
+        calls = sorted(
+            (call for call in self.calls.values() if call.start_timestamp >= lower),
+            key=lambda call: call.start_timestamp, reverse=sort_order == "descending",
+        )
+        if pagination_key:
+            ids = [call.call_id for call in calls]
+            calls = calls[ids.index(pagination_key) + 1:] if pagination_key in ids else []
+        return [call.refresh() for call in calls[:limit]]
+
+
+class FakeRetell:
+    """In-process stand-in for AsyncRetell covering the call API the dialer uses."""
+
+    def __init__(self, faults, call_seconds=0.2):
+        self.call = FakeCallApi(faults, call_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the fake Zoho Recruit API for manual runs.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    print(f"Fake Zoho on http://127.0.0.1:{args.port}/ (point ZOHO_BASE_URL at it)")
+    serve_zoho(multiprocessing.Queue(), port=args.port, size=args.size, latency=args.latency,
+               rate_limit_rate=args.rate_limit_rate, error_rate=args.error_rate)
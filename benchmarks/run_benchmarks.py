@@ -0,0 +1,258 @@
+"""Offline throughput benchmark for the fetch, evaluate and dial stages.
+
+Zoho is replaced by a local HTTP server (fake_services.FakeZoho), Gemini by
+a fake chat model and Retell by an in-process fake client, all with
+configurable latency, 429 and error injection. Each pool size runs in a
+fresh working directory, so stores, caches and journals start empty.
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 50000 --output benchmarks.jsonl
+
+Peak memory comes from tracemalloc, which slows Python code noticeably;
+pass --no-tracemalloc when only throughput matters.
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+import contextlib
+from datetime import datetime, timezone
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARK_DIR)
+
+from fake_services import FaultInjector, FakeRetell, fake_llm, start_fake_zoho
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+@contextlib.contextmanager
+def measure(result, trace_memory):
+    """Fills result with seconds and peak_memory_mb for the enclosed block; stdout is discarded."""
+    if trace_memory:
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    result['peak_memory_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1) if trace_memory else None
+
+
+def summarise(stage, size, count, latencies, result, faults):
+    seconds = result['seconds']
+    return {
+        'stage': stage,
+        'pool_size': size,
+        'candidates': count,
+        'seconds': seconds,
+        'candidates_per_sec': round(count / seconds, 1) if seconds else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        'peak_memory_mb': result['peak_memory_mb'],
+        **faults,
+    }
+
+
+def timed_zoho_requests(latencies):
+    """Records the client-side latency of every Zoho GET, rate limiter waits and retries included."""
+    from zoho_client import get_zoho_client
+    client = get_zoho_client()
+    get = type(client).get
+
+    def timed_get(endpoint, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return get(client, endpoint, *args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    client.get = timed_get
+
+
+def zoho_stats(base_url):
+    import httpx
+    return httpx.get(f"{base_url}__stats").json()
+
+
+def run_applicants(size, base_url, args, trace_memory):
+    from applicants import main_applicants
+    from record_io import read_records
+    from candidate_dedup import CANDIDATES_DEDUPLICATED
+    import httpx
+
+    httpx.post(f"{base_url}__reset", json={'size': size, 'duplicate_rate': args.duplicate_rate}).raise_for_status()
+    deduplicated = CANDIDATES_DEDUPLICATED.value(stage='fetch')
+    latencies = []
+    timed_zoho_requests(latencies)
+    result = {}
+    # main_applicants asks which job to sync; the fake server has exactly one
+    stdin, sys.stdin = sys.stdin, io.StringIO("1\n")
+    try:
+        with measure(result, trace_memory):
+            job_description, detailed_path, job_title = main_applicants()
+    finally:
+        sys.stdin = stdin
+    count = sum(1 for _ in read_records(detailed_path))
+    stats = {**zoho_stats(base_url), 'deduplicated': CANDIDATES_DEDUPLICATED.value(stage='fetch') - deduplicated}
+    summary = summarise('applicants', size, count, latencies, result, stats)
+    return summary, (job_description, detailed_path, job_title)
+
+
+def run_evaluate(size, job, args, trace_memory):
+    from app_gemini import evaluate_candidates, results_path
+    from applicants import read_detailed_applications
+    from candidate_dedup import CANDIDATES_DEDUPLICATED
+
+    job_description, detailed_path, job_title = job
+    faults = FaultInjector(args.llm_latency, rate_limit_rate=args.rate_limit_rate, error_rate=args.error_rate)
+    latencies = []
+    result = {}
+    deduplicated = CANDIDATES_DEDUPLICATED.value(stage='evaluate')
+    with measure(result, trace_memory):
+        selected, rejected = evaluate_candidates(
+            job_description, read_detailed_applications(detailed_path), job_title,
+            concurrency=args.eval_concurrency, batch_size=args.batch_size,
+            llm=fake_llm(faults, latencies=latencies),
+        )
+    stats = {**faults.counts, 'deduplicated': CANDIDATES_DEDUPLICATED.value(stage='evaluate') - deduplicated}
+    summary = summarise('evaluate', size, selected + rejected, latencies, result, stats)
+    return summary, results_path(job_title, 'selected')
+
+
+def run_dial(size, selected_path, args, trace_memory):
+    from retell_client import dial_candidates
+    from call_poller import CallStatusPoller
+    from call_results import CallResultWriter
+    from record_io import read_records
+
+    faults = FaultInjector(args.retell_latency, rate_limit_rate=args.rate_limit_rate, error_rate=args.error_rate)
+    retell_client = FakeRetell(faults, call_seconds=args.call_seconds)
+    latencies = []
+    dialled_rows = 0
+
+    async def dial():
+        nonlocal dialled_rows
+        poller = CallStatusPoller(retell_client, fast_interval=args.poll_interval, slow_interval=args.poll_interval * 5)
+        with CallResultWriter(os.path.join('csv', 'candidate_responses.csv')) as writer:
+            async for row in dial_candidates(retell_client, read_records(selected_path), args.dial_concurrency, poller=poller):
+                writer.write(row)
+                dialled_rows += 1
+                dialled = retell_client.call.dialled.get(row['Phone Number'].lstrip("'"))
+                if dialled:
+                    latencies.append(time.perf_counter() - dialled)
+
+    result = {}
+    with measure(result, trace_memory):
+        asyncio.run(dial())
+    return summarise('dial', size, dialled_rows, latencies, result, faults.counts)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_table(rows):
+    columns = ['pool_size', 'stage', 'candidates', 'seconds', 'candidates_per_sec', 'p50_ms', 'p99_ms', 'peak_memory_mb', 'requests', 'rate_limited', 'errors', 'response_bytes', 'deduplicated']
+    print(" ".join(f"{column:>18}" for column in columns))
+    for row in rows:
+        print(" ".join(f"{str(row.get(column)):>18}" for column in columns))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000])
+    parser.add_argument('--stages', nargs='+', choices=['applicants', 'evaluate', 'dial'], default=['applicants', 'evaluate', 'dial'])
+    parser.add_argument('--zoho-latency', type=float, default=0.05)
+    parser.add_argument('--llm-latency', type=float, default=0.5)
+    parser.add_argument('--retell-latency', type=float, default=0.05)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with a server error")
+    parser.add_argument('--duplicate-rate', type=float, default=0.0, help="fraction of applications that are re-applications by an earlier candidate")
+    parser.add_argument('--zoho-rate', type=float, default=100.0, help="starting Zoho requests/sec for the client rate limiter")
+    parser.add_argument('--eval-concurrency', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--dial-concurrency', type=int, default=50)
+    parser.add_argument('--call-seconds', type=float, default=0.2, help="simulated duration of each call")
+    parser.add_argument('--poll-interval', type=float, default=0.05)
+    parser.add_argument('--no-tracemalloc', action='store_true')
+    parser.add_argument('--output', help="append one JSON line per stage to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    zoho, base_url = start_fake_zoho(
+        size=max(args.sizes), latency=args.zoho_latency,
+        rate_limit_rate=args.rate_limit_rate, error_rate=args.error_rate,
+    )
+
+    # Module-level settings are read at import, so configure them before importing the code under test
+    os.environ['ZOHO_BASE_URL'] = base_url
+    os.environ['ZOHO_RATE_LIMIT'] = str(args.zoho_rate)
+    os.environ['ZOHO_MAX_RATE_LIMIT'] = str(args.zoho_rate * 2)
+    sys.path[:0] = [ROOT, os.path.join(ROOT, 'retell')]
+    from auth.zoho_auth import write_tokens
+    from app_gemini import build_candidate_result
+    from record_io import write_records
+
+    trace_memory = not args.no_tracemalloc
+    if trace_memory:
+        tracemalloc.start()
+
+    rows = []
+    try:
+        for size in args.sizes:
+            os.chdir(tempfile.mkdtemp(prefix=f"benchmark_{size}_"))
+            os.makedirs('json')
+            os.makedirs('csv')
+            write_tokens({"access_token": "benchmark", "expires_at": time.time() + 86400})
+            print(f"Pool of {size} candidates in {os.getcwd()}")
+
+            job = None
+            if 'applicants' in args.stages or 'evaluate' in args.stages:
+                summary, job = run_applicants(size, base_url, args, trace_memory)
+                if 'applicants' in args.stages:
+                    rows.append(summary)
+
+            selected_path = None
+            if 'evaluate' in args.stages:
+                summary, selected_path = run_evaluate(size, job, args, trace_memory)
+                rows.append(summary)
+
+            if 'dial' in args.stages:
+                if selected_path is None:
+                    # Dial-only runs call the whole pool
+                    from fake_services import synthetic_pool
+                    _, applications, candidates = synthetic_pool(size)
+                    selected_path = os.path.join('json', 'benchmark_pool.jsonl')
+                    write_records(selected_path, (
+                        build_candidate_result(candidates[app['$Candidate_Id']], {}, app['Posting_Title'])
+                        for app in applications
+                    ))
+                rows.append(run_dial(size, selected_path, args, trace_memory))
+    finally:
+        zoho.terminate()
+
+    print_table(rows)
+    if args.output:
+        run = {'revision': git_revision(), 'timestamp': datetime.now(timezone.utc).isoformat()}
+        with open(os.path.join(ROOT, args.output), 'a') as f:
+            for row in rows:
+                f.write(json.dumps({**run, **row}) + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Measures cli.py startup against its targets and exits non-zero if any is missed.
+
+Commands that would touch the network are measured up to the point where
+their first request would go out, by importing exactly what the subcommand
+imports.
+
+    python benchmarks/startup_time.py --runs 7
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (label, argv after the interpreter, target seconds)
+CASES = [
+    ("cli --help", [os.path.join(ROOT, 'cli.py'), '--help'], 0.25),
+    ("cli status", [os.path.join(ROOT, 'cli.py'), 'status'], 0.25),
+    ("list-jobs / fetch imports", ['-c', "import sys; sys.path.insert(0, sys.argv[1]); import cli, applicants", ROOT], 0.5),
+    ("dial imports", ['-c', "import sys; sys.path[:0] = [sys.argv[1], sys.argv[1] + '/retell']; import cli, retell_client", ROOT], 0.5),
+]
+
+
+def time_command(argv, runs, cwd):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *argv], cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    # An empty working directory keeps `status` from depending on local data
+    cwd = tempfile.mkdtemp(prefix='startup_time_')
+    missed = 0
+    print(f"{'command':<28}{'median':>10}{'target':>10}")
+    for label, argv, target in CASES:
+        median = time_command(argv, args.runs, cwd)
+        ok = median <= target
+        missed += not ok
+        print(f"{label:<28}{median:>9.3f}s{target:>9.2f}s  {'ok' if ok else 'MISSED'}")
+    return 1 if missed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
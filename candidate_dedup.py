@@ -0,0 +1,85 @@
+import os
+import re
+from collections import OrderedDict
+
+from instrumentation import metrics
+
+DEDUP_ENABLED = os.getenv('CANDIDATE_DEDUP', '1').lower() in ('1', 'true', 'yes')
+# Identities and evaluations remembered per run; duplicates further apart than this are evaluated again
+DEDUP_WINDOW = int(os.getenv('CANDIDATE_DEDUP_WINDOW', 10000))
+# Trailing digits compared, so "+91 98765 43210" and "09876543210" match
+PHONE_DIGITS = 10
+
+CANDIDATES_DEDUPLICATED = metrics.counter('candidates_deduplicated_total', 'Candidate fetches and LLM evaluations skipped because another application of the same person covered them')
+
+NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_email(email):
+    email = str(email or '').strip().lower()
+    return email if '@' in email else None
+
+
+def normalize_phone(phone):
+    digits = NON_DIGITS.sub('', str(phone or ''))
+    return digits[-PHONE_DIGITS:] if len(digits) >= 7 else None
+
+
+def identity_keys(candidate):
+    """Keys that identify the person behind an application, strongest first."""
+    keys = []
+    if candidate.get('$Candidate_Id'):
+        keys.append(('id', str(candidate.get('$Candidate_Id'))))
+    email = normalize_email(candidate.get('Email'))
+    if email:
+        keys.append(('email', email))
+    phone = normalize_phone(candidate.get('Mobile'))
+    if phone:
+        keys.append(('phone', phone))
+    return keys
+
+
+class CandidateDeduplicator:
+    """Recognises applications that belong to the same person within a run.
+
+    Applications match on $Candidate_Id, or failing that on email or phone,
+    so a re-application or a duplicate Zoho candidate record joins the group
+    of whichever application was seen first. The first evaluation of a
+    group is kept and reused for the rest. Both maps are LRU-bounded by
+    `window`, so memory stays flat however large the pool is.
+    """
+
+    def __init__(self, window=DEDUP_WINDOW, enabled=DEDUP_ENABLED):
+        self.window = window
+        self.enabled = enabled
+        self.groups = OrderedDict()
+        self.evaluations = OrderedDict()
+        self.avoided = {'fetch': 0, 'evaluate': 0}
+
+    def _remember(self, mapping, key, value, limit):
+        mapping[key] = value
+        mapping.move_to_end(key)
+        while len(mapping) > limit:
+            mapping.popitem(last=False)
+
+    def group(self, candidate):
+        """The group key for `candidate`, or None when it carries no usable identity or dedup is off."""
+        keys = identity_keys(candidate) if self.enabled else []
+        if not keys:
+            return None
+        group = next((self.groups[key] for key in keys if key in self.groups), keys[0])
+        for key in keys:
+            # Each application adds up to three identity keys
+            self._remember(self.groups, key, group, self.window * 3)
+        return group
+
+    def evaluation(self, group):
+        return self.evaluations.get(group) if group is not None else None
+
+    def record_evaluation(self, group, evaluation):
+        if group is not None:
+            self._remember(self.evaluations, group, evaluation, self.window)
+
+    def skipped(self, count=1, stage='evaluate'):
+        self.avoided[stage] += count
+        CANDIDATES_DEDUPLICATED.inc(count, stage=stage)
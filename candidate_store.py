@@ -0,0 +1,150 @@
+import os
+import json
+import sqlite3
+import threading
+from zoho_records import Application, Candidate
+
+STORE_PATH = os.getenv('CANDIDATE_STORE_PATH', os.path.join('json', 'candidate_store.db'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    candidate_id TEXT,
+    modified_time TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (id, job_id)
+);
+CREATE INDEX IF NOT EXISTS applications_job ON applications (job_id);
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    modified_time TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL
+);
+"""
+
+
+class CandidateStore:
+    """Local SQLite copy of Zoho applications and hydrated candidates.
+
+    Records are stored as JSON of their zoho_records projection, keyed by
+    their Zoho ID along with Modified_Time, and read back as Application and
+    Candidate records. Applications are keyed by (id, job_id), since openings
+    sharing a Posting_Title each list the same applications. sync_state keeps
+    one watermark per sync scope so the next run only asks Zoho for what
+    changed after it.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.migrate()
+            self.conn.executescript(SCHEMA)
+
+    def migrate(self):
+        """Drops an applications table keyed by id alone, along with the watermarks that vouched for it.
+
+        Such a table let one opening overwrite another's rows, so its
+        contents can't be trusted; the next sync of each job starts over.
+        """
+        primary_key = [row[1] for row in self.conn.execute("PRAGMA table_info(applications)") if row[5]]
+        if primary_key == ['id']:
+            self.conn.execute("DROP TABLE applications")
+            self.conn.execute("DELETE FROM sync_state WHERE scope LIKE 'applications:%'")
+
+    def get_watermark(self, scope):
+        row = self.conn.execute("SELECT watermark FROM sync_state WHERE scope = ?", (scope,)).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, scope, watermark):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO sync_state (scope, watermark) VALUES (?, ?) "
+                "ON CONFLICT(scope) DO UPDATE SET watermark = excluded.watermark",
+                (scope, watermark),
+            )
+
+    def upsert_applications(self, applications, job_id):
+        rows = [
+            (str(app['id']), str(job_id), str(app.get('$Candidate_Id') or ''), app.get('Modified_Time'), json.dumps(Application.from_zoho(app).to_dict()))
+            for app in applications
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO applications (id, job_id, candidate_id, modified_time, data) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def upsert_candidates(self, candidates):
+        rows = [
+            (str(candidate_id), record.get('Modified_Time'), json.dumps(Candidate.from_zoho(record).to_dict()))
+            for candidate_id, record in candidates.items()
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO candidates (id, modified_time, data) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def iter_applications(self, job_id):
+        """Yields a job's applications one at a time straight off the cursor."""
+        rows = self.conn.execute("SELECT data FROM applications WHERE job_id = ? ORDER BY rowid", (str(job_id),))
+        for (data,) in rows:
+            yield Application.from_zoho(json.loads(data))
+
+    def candidate_application_counts(self, job_ids):
+        """{candidate_id: number of distinct applications} across the given jobs."""
+        job_ids = [str(job_id) for job_id in job_ids]
+        rows = self.conn.execute(
+            f"SELECT candidate_id, COUNT(DISTINCT id) FROM applications WHERE job_id IN ({','.join('?' * len(job_ids))}) "
+            "AND candidate_id != '' GROUP BY candidate_id",
+            job_ids,
+        )
+        return dict(rows)
+
+    def existing_candidate_ids(self, candidate_ids):
+        """The subset of candidate_ids already hydrated, without loading their records."""
+        existing = set()
+        candidate_ids = [str(candidate_id) for candidate_id in candidate_ids]
+        for i in range(0, len(candidate_ids), 500):
+            chunk = candidate_ids[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT id FROM candidates WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            existing.update(candidate_id for (candidate_id,) in rows)
+        return existing
+
+    def get_candidates(self, candidate_ids):
+        candidates = {}
+        candidate_ids = [str(candidate_id) for candidate_id in candidate_ids]
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(candidate_ids), 500):
+            chunk = candidate_ids[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT id, data FROM candidates WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            candidates.update((candidate_id, Candidate.from_zoho(json.loads(data))) for candidate_id, data in rows)
+        return candidates
+
+    def stats(self):
+        """Row counts and every sync watermark, for status reports."""
+        return {
+            'applications': self.conn.execute("SELECT COUNT(DISTINCT id) FROM applications").fetchone()[0],
+            'candidates': self.conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0],
+            'watermarks': dict(self.conn.execute("SELECT scope, watermark FROM sync_state ORDER BY scope")),
+        }
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
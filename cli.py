@@ -0,0 +1,188 @@
+"""Command-line entry point for the recruiting workflow.
+
+    python cli.py list-jobs            # openings in Zoho Recruit
+    python cli.py fetch --all-jobs     # sync applicants of every in-progress opening
+    python cli.py evaluate --job-id ID # sync and screen one or more openings
+    python cli.py evaluate --all-jobs --replay-failed   # re-screen only failed candidates
+    python cli.py dial                 # call shortlisted candidates
+    python cli.py dial --replay-failed # re-dial only failed calls
+    python cli.py status               # local progress only, no network
+
+Only the standard library is imported up front; each subcommand imports
+what it needs. LangChain/Gemini load only for `evaluate` and the Retell SDK
+only once `dial` places a call. benchmarks/startup_time.py measures the
+startup targets: `--help` and `status` under 0.25 s, `list-jobs` and
+`fetch` ready to send their first request under 0.5 s.
+"""
+import os
+import sys
+import glob
+import json
+import asyncio
+import argparse
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def add_job_selection(parser):
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--all-jobs', action='store_true', help="every in-progress opening")
+    group.add_argument('--job-id', action='append', dest='job_ids', metavar='ID', help="this opening; repeatable")
+
+
+def list_jobs(args):
+    from applicants import fetch_job_openings, get_in_progress_job_openings
+
+    job_openings = fetch_job_openings()
+    if job_openings is None:
+        return 1
+    if not args.all:
+        job_openings = get_in_progress_job_openings(job_openings)
+    for job in job_openings:
+        print(f"{job['id']}\t{job.get('Job_Opening_Status', '')}\t{job['Posting_Title']}")
+    return 0
+
+
+def fetch(args):
+    from applicants import main_applicants_batch
+    from instrumentation import metrics
+
+    jobs, _ = main_applicants_batch(args.job_ids)
+    metrics.log_summary()
+    return 0 if jobs else 1
+
+
+def evaluate(args):
+    from app_gemini import main_batch, replay_failed
+
+    if args.replay_failed:
+        replay_failed(args.job_ids)
+    else:
+        main_batch(args.job_ids)
+    return 0
+
+
+def dial(args):
+    sys.path.append(os.path.join(ROOT, 'retell'))
+    from retell_client import main, replay_failed_calls
+    from instrumentation import metrics
+
+    if args.replay_failed:
+        asyncio.run(replay_failed_calls())
+    else:
+        asyncio.run(main(resume=not args.no_resume, candidates_path=args.candidates))
+    metrics.log_summary()
+    return 0
+
+
+def journal_status(pattern):
+    from evaluation_journal import EvaluationJournal
+
+    jobs = {}
+    for path in sorted(glob.glob(pattern)):
+        job_title = os.path.basename(path)[len('evaluation_journal_'):-len('.jsonl')]
+        counts = {}
+        for state, _ in EvaluationJournal(path).replay().values():
+            counts[state] = counts.get(state, 0) + 1
+        jobs[job_title] = counts
+    return jobs
+
+
+def dead_letter_status(pattern):
+    from dead_letters import DeadLetterStore
+
+    stores = {}
+    for path in sorted(glob.glob(pattern)):
+        name = os.path.basename(path)[len('dead_letters_'):-len('.jsonl')]
+        store = DeadLetterStore(path, name)
+        store.load()
+        if store.entries:
+            stores[name] = store.counts()
+    return stores
+
+
+def call_status(path):
+    import csv
+    sys.path.append(os.path.join(ROOT, 'retell'))
+    from call_results import completed_call_keys
+
+    if not os.path.isfile(path):
+        return None
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = sum(1 for _ in csv.DictReader(file))
+    completed = len(completed_call_keys(path))
+    return {'rows': rows, 'completed': completed, 'errors': rows - completed}
+
+
+def status(args):
+    from candidate_store import CandidateStore, STORE_PATH
+
+    report = {
+        # Journals only exist for evaluations that are running or were interrupted
+        'evaluations_in_progress': journal_status(os.path.join('json', 'evaluation_journal_*.jsonl')),
+        'candidate_store': None,
+        'calls': call_status(os.path.join('csv', 'candidate_responses.csv')),
+        # Failures waiting for `evaluate --replay-failed` or `dial --replay-failed`, by error class
+        'dead_letters': dead_letter_status(os.path.join('json', 'dead_letters_*.jsonl')),
+    }
+    if os.path.exists(STORE_PATH):
+        with CandidateStore(STORE_PATH) as store:
+            report['candidate_store'] = store.stats()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    store = report['candidate_store']
+    print(f"Candidate store: {store['applications']} applications, {store['candidates']} candidates" if store else "Candidate store: empty")
+    for scope, watermark in (store or {}).get('watermarks', {}).items():
+        print(f"  {scope} synced up to {watermark}")
+    print("Evaluations in progress:" if report['evaluations_in_progress'] else "Evaluations in progress: none")
+    for job_title, counts in report['evaluations_in_progress'].items():
+        print(f"  {job_title}: " + ", ".join(f"{count} {state}" for state, count in sorted(counts.items())))
+    calls = report['calls']
+    print(f"Calls: {calls['completed']} completed, {calls['errors']} to retry" if calls else "Calls: none")
+    print("Failed, awaiting replay:" if report['dead_letters'] else "Failed, awaiting replay: none")
+    for name, counts in report['dead_letters'].items():
+        print(f"  {name}: " + ", ".join(f"{count} {error_class}" for error_class, count in sorted(counts.items())))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Screen and call Zoho Recruit applicants.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parser_list = subparsers.add_parser('list-jobs', help="list job openings")
+    parser_list.add_argument('--all', action='store_true', help="include openings that are not in progress")
+    parser_list.set_defaults(handler=list_jobs)
+
+    parser_fetch = subparsers.add_parser('fetch', help="sync applicants into the local store")
+    add_job_selection(parser_fetch)
+    parser_fetch.set_defaults(handler=fetch)
+
+    parser_evaluate = subparsers.add_parser('evaluate', help="sync and screen applicants with the LLM")
+    add_job_selection(parser_evaluate)
+    parser_evaluate.add_argument('--replay-failed', action='store_true', help="re-evaluate only candidates that failed in earlier runs")
+    parser_evaluate.set_defaults(handler=evaluate)
+
+    parser_dial = subparsers.add_parser('dial', help="call shortlisted candidates")
+    parser_dial.add_argument('--candidates', default=os.path.join('json', 'demo_candidates.json'), help="candidates to call: a JSON list or a .jsonl/.jsonl.gz file such as json/selected_candidates_<job>.jsonl")
+    parser_dial.add_argument('--no-resume', action='store_true', help="call candidates even if they already have a completed call")
+    parser_dial.add_argument('--replay-failed', action='store_true', help="re-dial only calls that failed in earlier runs")
+    parser_dial.set_defaults(handler=dial)
+
+    parser_status = subparsers.add_parser('status', help="show local sync, evaluation and call progress")
+    parser_status.add_argument('--json', action='store_true', help="machine-readable output")
+    parser_status.set_defaults(handler=status)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from instrumentation import configure_logging
+    configure_logging()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
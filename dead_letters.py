@@ -0,0 +1,202 @@
+import os
+import re
+import json
+import random
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+
+from instrumentation import metrics
+
+# Entries that have failed this many attempts in total are kept but no longer replayed
+DEAD_LETTER_MAX_ATTEMPTS = int(os.getenv('DEAD_LETTER_MAX_ATTEMPTS', 12))
+# Seconds to wait before replaying an entry, by error class; doubles with every failed replay
+REPLAY_BACKOFF = {
+    'rate_limited': 60,
+    'server_error': 15,
+    'timeout': 10,
+    'call_incomplete': 30,
+    'invalid_response': 0,
+    'other': 5,
+}
+REPLAY_MAX_DELAY = 600
+# Only a message that starts with the status counts; a 429 inside quoted model output or a phone number does not
+RATE_LIMIT_MESSAGE = re.compile(r"429\b")
+# Multiplies every replay delay; 0 replays immediately
+REPLAY_BACKOFF_SCALE = float(os.getenv('DEAD_LETTER_BACKOFF_SCALE', 1))
+
+logger = logging.getLogger(__name__)
+DEAD_LETTERS = metrics.counter('dead_letters_total', 'Work items moved to a dead-letter store by stage and error class')
+DEAD_LETTER_REPLAYS = metrics.counter('dead_letter_replays_total', 'Dead-letter replays by stage and outcome')
+
+
+def dead_letter_path(name):
+    return os.path.join('json', f'dead_letters_{name}.jsonl')
+
+
+def evaluation_dead_letter_path(job_title):
+    return dead_letter_path(f'evaluations_{job_title}')
+
+
+CALL_DEAD_LETTER_PATH = dead_letter_path('calls')
+
+
+def error_class(error):
+    """Coarse failure class used to pick a replay backoff and to label failure metrics."""
+    if getattr(error, 'error_class', None):
+        return error.error_class
+    name = type(error).__name__
+    status = getattr(error, 'status_code', None)
+    if status == 429 or RATE_LIMIT_MESSAGE.match(str(error)) or 'ResourceExhausted' in name or 'RateLimit' in name:
+        return 'rate_limited'
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)) or 'Timeout' in name:
+        return 'timeout'
+    if (isinstance(status, int) and status >= 500) or 'ServerError' in name or 'ServiceUnavailable' in name:
+        return 'server_error'
+    # JSONDecodeError is a ValueError; so are malformed batch responses
+    if isinstance(error, ValueError) or 'OutputParser' in name:
+        return 'invalid_response'
+    return 'other'
+
+
+def input_hash(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def replay_delay(entry):
+    base = REPLAY_BACKOFF.get(entry['error_class'], REPLAY_BACKOFF['other'])
+    delay = min(base * 2 ** entry.get('replays', 0), REPLAY_MAX_DELAY) * REPLAY_BACKOFF_SCALE
+    # Jitter so entries of one class do not all come back in the same instant
+    return delay * random.uniform(1, 1.5)
+
+
+class DeadLetterStore:
+    """Append-only JSONL of work items that failed after every retry.
+
+    Each line is {"key", "candidate_id", "input_hash", "error_class",
+    "error", "attempts", "replays", "failed_at", "payload"}, where key names
+    the work item (an application, or a call for one opening) and payload is
+    what a replay needs to redo the work. A later {"key", "resolved": true}
+    line clears an entry; replaying the file keeps the latest line per key,
+    like EvaluationJournal.
+    """
+
+    def __init__(self, path, stage):
+        self.path = path
+        self.stage = stage
+        self.entries = {}
+        self.file = None
+
+    def load(self):
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return self.entries
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt dead-letter line", extra={'path': self.path})
+                    continue
+                key = record.get('key') or record['candidate_id']
+                if record.get('resolved'):
+                    self.entries.pop(key, None)
+                else:
+                    self.entries[key] = record
+        return self.entries
+
+    def open(self):
+        self.load()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open(self.path, 'a', encoding='utf-8')
+        return self
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, default=str) + '\n')
+        self.file.flush()
+
+    def add(self, candidate_id, payload, error, attempts, key=None):
+        """Records a failure under key (default: candidate_id); attempts and replays carry over while the input is unchanged."""
+        candidate_id = str(candidate_id)
+        key = str(key or candidate_id)
+        digest = input_hash(payload)
+        previous = self.entries.get(key)
+        carried = previous if previous and previous['input_hash'] == digest else None
+        entry = {
+            'key': key,
+            'candidate_id': candidate_id,
+            'input_hash': digest,
+            'error_class': error_class(error),
+            'error': str(error),
+            'attempts': attempts + (carried['attempts'] if carried else 0),
+            'replays': carried['replays'] + 1 if carried else 0,
+            'failed_at': datetime.now(timezone.utc).isoformat(),
+            'payload': payload,
+        }
+        self.entries[key] = entry
+        self._write(entry)
+        DEAD_LETTERS.inc(stage=self.stage, error_class=entry['error_class'])
+        return entry
+
+    def resolve(self, key):
+        key = str(key)
+        if self.entries.pop(key, None) is not None:
+            self._write({'key': key, 'resolved': True, 'resolved_at': datetime.now(timezone.utc).isoformat()})
+
+    def pending(self, max_attempts=DEAD_LETTER_MAX_ATTEMPTS):
+        """Entries still worth replaying, oldest first."""
+        return [entry for entry in self.entries.values() if entry['attempts'] < max_attempts]
+
+    def counts(self):
+        counts = {}
+        for entry in self.entries.values():
+            counts[entry['error_class']] = counts.get(entry['error_class'], 0) + 1
+        return counts
+
+    def compact(self):
+        """Rewrites the file with only the unresolved entries and atomically swaps it in."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, default=str) + '\n')
+        reopen = self.file is not None
+        if reopen:
+            self.file.close()
+        os.replace(tmp_path, self.path)
+        if reopen:
+            self.file = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def replay_entries(entries, handle, concurrency, stage):
+    """Runs handle(entry) for every entry concurrently, each after its error-class backoff.
+
+    handle returns True when the entry succeeded. Returns (succeeded, failed).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def replay(entry):
+        # Waiting happens outside the semaphore so a long rate-limit backoff does not hold a slot
+        await asyncio.sleep(replay_delay(entry))
+        async with semaphore:
+            ok = await handle(entry)
+        DEAD_LETTER_REPLAYS.inc(stage=stage, outcome='resolved' if ok else 'failed')
+        return ok
+
+    results = await asyncio.gather(*(replay(entry) for entry in entries))
+    succeeded = sum(1 for ok in results if ok)
+    return succeeded, len(results) - succeeded
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from instrumentation import metrics
+
+CACHE_PATH = os.getenv('EVALUATION_CACHE_PATH', os.path.join('json', 'evaluation_cache.db'))
+CACHE_MAX_ENTRIES = int(os.getenv('EVALUATION_CACHE_MAX_ENTRIES', 50000))
+CACHE_MAX_AGE_DAYS = float(os.getenv('EVALUATION_CACHE_MAX_AGE_DAYS', 30))
+CACHE_BYPASS = os.getenv('EVALUATION_CACHE_BYPASS', '').lower() in ('1', 'true', 'yes')
+EVICT_EVERY = 500
+
+CACHE_LOOKUPS = metrics.counter("evaluation_cache_lookups_total", "Evaluation cache lookups by result")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS evaluations_last_used ON evaluations (last_used);
+"""
+
+
+def cache_key(*parts):
+    """sha256 over the canonical JSON of every input that can change an evaluation."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class EvaluationCache:
+    """Persistent LLM result cache keyed by a hash of the evaluation inputs.
+
+    Entries older than max_age_days are dropped and the table is trimmed
+    to max_entries by least-recent use. With bypass set, lookups always
+    miss but fresh results are still written, so a forced re-run refreshes
+    the cache.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, max_age_days=CACHE_MAX_AGE_DAYS, bypass=CACHE_BYPASS):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evict()
+
+    def get(self, key):
+        if self.bypass:
+            self.misses += 1
+            CACHE_LOOKUPS.inc(result="bypass")
+            return None
+
+        row = self.conn.execute(
+            "SELECT value, created_at FROM evaluations WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.max_age:
+            self.misses += 1
+            CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+        with self.conn:
+            self.conn.execute("UPDATE evaluations SET last_used = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        CACHE_LOOKUPS.inc(result="hit")
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO evaluations (key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+        self.writes += 1
+        if self.writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM evaluations WHERE created_at < ?", (time.time() - self.max_age,))
+            self.conn.execute(
+                "DELETE FROM evaluations WHERE key IN ("
+                "SELECT key FROM evaluations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'bypass': self.bypass,
+        }
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,133 @@
+import os
+import json
+import logging
+
+COMPACT_EVERY = int(os.getenv('JOURNAL_COMPACT_EVERY', 500))
+
+logger = logging.getLogger(__name__)
+
+
+def journal_path(job_title):
+    return os.path.join('json', f'evaluation_journal_{job_title}.jsonl')
+
+
+class EvaluationJournal:
+    """Append-only JSONL log with one record per evaluated application.
+
+    Each line is {"candidate_id", "status", "result"}, where candidate_id
+    holds app_gemini.application_key so a person's several applications each
+    keep their own record. Replaying the file in order (last record per key
+    wins) rebuilds the run state, so resume does not depend on the order in
+    which candidates were processed.
+
+    Only each candidate's status and the line holding its latest record are
+    kept in memory; results() and compact() stream the rest from disk.
+    """
+
+    def __init__(self, path, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.compact_every = compact_every
+        self.records = {}
+        self.lines = 0
+        self.appended = 0
+        self.file = None
+
+    def scan(self, warn=True):
+        """Yields (line_number, record) for every readable line in the file."""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves at most one torn trailing line
+                    if warn:
+                        logger.warning("Skipping corrupt journal line", extra={'path': self.path})
+
+    def replay(self):
+        """Rebuilds and returns {candidate_id: (status, line_number)}."""
+        self.records = {}
+        self.lines = 0
+        if not os.path.exists(self.path):
+            return self.records
+
+        for line_number, record in self.scan():
+            self.records.pop(record['candidate_id'], None)
+            self.records[record['candidate_id']] = (record['status'], line_number)
+        with open(self.path, 'rb') as f:
+            self.lines = sum(1 for _ in f)
+        return self.records
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open(self.path, 'a+', encoding='utf-8')
+        # Terminate a torn trailing line so the next record starts on its own line
+        if self.file.tell():
+            self.file.seek(self.file.tell() - 1)
+            if self.file.read(1) != '\n':
+                self.file.write('\n')
+        return self
+
+    def append(self, candidate_id, status, result):
+        record = {'candidate_id': candidate_id, 'status': status, 'result': result}
+        self.records.pop(candidate_id, None)
+        self.records[candidate_id] = (status, self.lines)
+
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+        self.lines += 1
+
+        self.appended += 1
+        if self.compact_every and self.appended % self.compact_every == 0:
+            self.compact()
+
+    def latest(self):
+        """Yields the latest record of every candidate, in file order."""
+        if self.file:
+            self.file.flush()
+        if not os.path.exists(self.path):
+            return
+        for line_number, record in self.scan(warn=False):
+            if self.records.get(record['candidate_id'], (None, None))[1] == line_number:
+                yield record
+
+    def compact(self):
+        """Rewrites the journal with one line per candidate and atomically swaps it in."""
+        tmp_path = self.path + '.tmp'
+        records = {}
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for line_number, record in enumerate(self.latest()):
+                f.write(json.dumps(record) + '\n')
+                records[record['candidate_id']] = (record['status'], line_number)
+            f.flush()
+            os.fsync(f.fileno())
+
+        reopen = self.file is not None
+        if reopen:
+            self.file.close()
+        os.replace(tmp_path, self.path)
+        self.records = records
+        self.lines = len(records)
+        if reopen:
+            self.file = open(self.path, 'a+', encoding='utf-8')
+
+    def results(self, status):
+        return (record['result'] for record in self.latest() if record['status'] == status)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import bisect
+import logging
+import threading
+import contextlib
+from collections import deque
+
+METRICS_PATH = os.getenv('METRICS_PATH', os.path.join('json', 'metrics.prom'))
+# Rewrite the metrics file this often during a run so a textfile collector sees progress; 0 writes only at exit
+METRICS_WRITE_INTERVAL = float(os.getenv('METRICS_WRITE_INTERVAL', 15))
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# "text" for key=value lines, "json" for one JSON object per line
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# Percentiles in the summary come from the most recent observations per series
+SAMPLE_LIMIT = 10000
+
+
+def label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def summary_label(key):
+    return ",".join(f"{name}={value}" for name, value in key) or 'total'
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self.values.get(label_key(labels), 0)
+
+    def render(self):
+        with self.lock:
+            return [f"{self.name}{format_labels(key)} {value:g}" for key, value in self.values.items()]
+
+    def summary(self):
+        with self.lock:
+            return {summary_label(key): value for key, value in self.values.items()}
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[label_key(labels)] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = label_key(labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {
+                    'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0, 'samples': deque(maxlen=SAMPLE_LIMIT),
+                }
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+            series['samples'].append(value)
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for key, series in self.series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['counts']):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{format_labels(key, [('le', f'{bound:g}')])} {cumulative}")
+                lines.append(f"{self.name}_bucket{format_labels(key, [('le', '+Inf')])} {series['count']}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {series['sum']:g}")
+                lines.append(f"{self.name}_count{format_labels(key)} {series['count']}")
+        return lines
+
+    def summary(self):
+        with self.lock:
+            return {
+                summary_label(key): {
+                    'count': series['count'],
+                    'p50': round(percentile(series['samples'], 50), 4),
+                    'p99': round(percentile(series['samples'], 99), 4),
+                }
+                for key, series in self.series.items()
+            }
+
+
+class MetricsRegistry:
+    """Process-wide counters, gauges and histograms with Prometheus text output.
+
+    Metrics are created on first use and shared by name, so modules declare
+    the ones they update at import time. render() produces the text
+    exposition format; write() puts it in a file for node_exporter's
+    textfile collector or anything else that scrapes files.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.writer = None
+
+    def _get(self, metric_type, name, documentation, *args):
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = metric_type(name, documentation, *args)
+            return self.metrics[name]
+
+    def counter(self, name, documentation):
+        return self._get(Counter, name, documentation)
+
+    def gauge(self, name, documentation):
+        return self._get(Gauge, name, documentation)
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, documentation, buckets)
+
+    def render(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            rendered = metric.render()
+            if rendered:
+                lines += [f"# HELP {metric.name} {metric.documentation}", f"# TYPE {metric.name} {metric.kind}", *rendered]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path=METRICS_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self.render())
+        # Scrapers never see a half-written file
+        os.replace(temp_path, path)
+
+    def start_writer(self, path=METRICS_PATH, interval=METRICS_WRITE_INTERVAL):
+        """Rewrites the metrics file every `interval` seconds on a daemon thread."""
+        if interval <= 0 or self.writer:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write(path)
+                except OSError as e:
+                    logger.warning("Could not write metrics file", extra={'path': path, 'error': str(e)})
+
+        self.writer = threading.Thread(target=run, name='metrics-writer', daemon=True)
+        self.writer.start()
+
+    def summary(self):
+        return {name: metric.summary() for name, metric in list(self.metrics.items()) if metric.summary()}
+
+    def log_summary(self, path=METRICS_PATH):
+        """Writes the metrics file and logs one line per metric at the end of a run."""
+        self.write(path)
+        for name, values in self.summary().items():
+            logger.info(name, extra={'metric': values})
+        logger.info("Metrics written", extra={'path': path})
+
+
+# Attributes every LogRecord has; anything else came in through extra=
+RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def record_fields(record):
+    return {key: value for key, value in vars(record).items() if key not in RESERVED_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **record_fields(record),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    def format(self, record):
+        fields = " ".join(
+            f"{key}={json.dumps(value, default=str) if not isinstance(value, (int, float)) else value}"
+            for key, value in record_fields(record).items()
+        )
+        line = f"{self.formatTime(record)} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        if fields:
+            line = f"{line} {fields}"
+        if record.exc_info:
+            line = f"{line}\n{self.formatException(record.exc_info)}"
+        return line
+
+
+def configure_logging(level=LOG_LEVEL, log_format=LOG_FORMAT):
+    """Sends leveled, structured log lines to stderr; safe to call more than once."""
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in root.handlers:
+        if getattr(handler, 'structured', False):
+            return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if log_format == 'json' else KeyValueFormatter())
+    handler.structured = True
+    root.addHandler(handler)
+    # Per-request lines from the HTTP clients would drown out ours
+    for noisy in ('httpx', 'httpcore', 'aiohttp.access'):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+
+logger = logging.getLogger(__name__)
+metrics = MetricsRegistry()
@@ -0,0 +1,278 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+from applicants import choose_job, filter_applications_by_job, fetch_candidate_details_async, HYDRATION_CONCURRENCY
+from app_gemini import (
+    EVALUATION_CONCURRENCY, build_evaluation_chain, evaluation_cache_context, select_required_tech,
+    application_key, evaluate_candidate, record_failure, record_evaluation, record_auto_rejection, save_results,
+)
+from evaluation_journal import EvaluationJournal, journal_path
+from evaluation_cache import EvaluationCache, CACHE_BYPASS
+from prescreen import prescreen_candidates, PRESCREEN_ENABLED
+from zoho_client import AsyncZohoClient
+from zoho_records import Application, Candidate
+from candidate_dedup import CandidateDeduplicator
+from profile_renderer import load_encoding
+from dead_letters import DeadLetterStore, evaluation_dead_letter_path, CALL_DEAD_LETTER_PATH
+from instrumentation import metrics, configure_logging
+
+# The Retell modules import each other by bare name
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'retell'))
+from retell_client import initialize_retell, dial_candidate, DIAL_CONCURRENCY
+from call_webhooks import CallEventReceiver, WEBHOOK_PORT
+from call_poller import CallStatusPoller
+from call_results import CallResultWriter, candidate_call_key, completed_call_keys
+
+# Per-stage worker counts; each stage only pulls work when it has a free worker
+HYDRATE_WORKERS = int(os.getenv('PIPELINE_HYDRATE_WORKERS', HYDRATION_CONCURRENCY))
+EVALUATE_WORKERS = int(os.getenv('PIPELINE_EVALUATE_WORKERS', EVALUATION_CONCURRENCY))
+DIAL_WORKERS = int(os.getenv('PIPELINE_DIAL_WORKERS', DIAL_CONCURRENCY))
+# Bound on hydrated-but-unevaluated and shortlisted-but-undialled candidates; a full queue stalls the stage before it
+QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 20))
+DIAL_ENABLED = os.getenv('PIPELINE_DIAL', '1').lower() in ('1', 'true', 'yes')
+CALL_RESULTS_PATH = r'csv/candidate_responses.csv'
+
+logger = logging.getLogger(__name__)
+QUEUE_DEPTH = metrics.gauge('pipeline_queue_depth', 'Candidates waiting in front of each pipeline stage')
+TIME_TO_FIRST_CALL = metrics.gauge('pipeline_time_to_first_call_seconds', 'Seconds from pipeline start to the first dialled candidate')
+
+
+async def supervise(coro, workers):
+    """Awaits coro while watching the worker tasks; the first worker to raise cancels coro and re-raises.
+
+    A dead worker stops draining its queue, so without this the stage in
+    front of it would block on put() forever instead of failing.
+    """
+    task = asyncio.ensure_future(coro)
+    watched = set(workers)
+    try:
+        while True:
+            done, watched = await asyncio.wait({task, *watched}, return_when=asyncio.FIRST_COMPLETED)
+            watched.discard(task)
+            for worker in done - {task}:
+                if not worker.cancelled() and worker.exception():
+                    raise worker.exception()
+            if task in done:
+                return task.result()
+    finally:
+        task.cancel()
+
+
+class PipelineStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counts = {'hydrated': 0, 'hydrate_failed': 0, 'evaluated': 0, 'auto_rejected': 0, 'shortlisted': 0, 'failed': 0, 'dialled': 0}
+        self.first_call = None
+
+    def add(self, name):
+        self.counts[name] += 1
+
+    def call_started(self):
+        if self.first_call is None:
+            self.first_call = time.monotonic() - self.started
+            TIME_TO_FIRST_CALL.set(round(self.first_call, 1))
+            logger.info("First call placed", extra={'seconds_after_start': round(self.first_call, 1)})
+
+    def summary(self):
+        return {**self.counts, 'elapsed_seconds': round(time.monotonic() - self.started, 1), 'time_to_first_call': self.first_call}
+
+
+async def run_pipeline(selected_job, hydrate_workers=HYDRATE_WORKERS, evaluate_workers=EVALUATE_WORKERS, dial_workers=DIAL_WORKERS,
+                       queue_size=QUEUE_SIZE, dial=DIAL_ENABLED, bypass_cache=CACHE_BYPASS, prescreen=PRESCREEN_ENABLED,
+                       chain=None, retell_client=None, results_path=CALL_RESULTS_PATH):
+    """Hydrates, evaluates and dials a job's applicants as overlapping stages.
+
+    Stages are linked by bounded queues, so a candidate is evaluated as soon
+    as its details arrive and dialled as soon as it is shortlisted.
+    Applications sharing a $Candidate_Id travel as one group: one fetch,
+    one evaluation, a journal record for each. Progress
+    is journaled like evaluate_candidates, so an interrupted run resumes:
+    journaled candidates are not re-fetched, and shortlisted ones without a
+    completed call are dialled again.
+    """
+    job_title = selected_job['Posting_Title']
+    job_description = selected_job.get("Job_Description", "")
+    required_tech = select_required_tech(job_title)
+    stats = PipelineStats()
+
+    journal = EvaluationJournal(journal_path(job_title))
+    dead_letters = DeadLetterStore(evaluation_dead_letter_path(job_title), 'evaluate')
+    call_dead_letters = DeadLetterStore(CALL_DEAD_LETTER_PATH, 'dial')
+    done = journal.replay()
+    applications = await asyncio.to_thread(filter_applications_by_job, job_title, selected_job['id'])
+    pending = [app for app in map(Application.from_zoho, applications) if app.get('$Candidate_Id') and application_key(app) not in done]
+    pending_groups = {}
+    for app in pending:
+        pending_groups.setdefault(str(app['$Candidate_Id']), []).append(app)
+    dedup = CandidateDeduplicator()
+    if len(pending) > len(pending_groups):
+        dedup.skipped(len(pending) - len(pending_groups), stage='fetch')
+    logger.info("Applications loaded", extra={'job_title': job_title, 'applications': len(applications), 'pending': len(pending), 'candidates': len(pending_groups)})
+
+    # Keys of calls completed or already queued in this run; each person is dialled once
+    completed_calls = completed_call_keys(results_path) if dial else set()
+    redial = []
+    for result in (journal.results('selected') if dial else []):
+        if candidate_call_key(result) not in completed_calls:
+            completed_calls.add(candidate_call_key(result))
+            redial.append(result)
+
+    hydrate_queue = asyncio.Queue()
+    for apps in pending_groups.values():
+        hydrate_queue.put_nowait(apps)
+    evaluate_queue = asyncio.Queue(maxsize=queue_size)
+    dial_queue = asyncio.Queue(maxsize=queue_size)
+
+    def report_depths():
+        QUEUE_DEPTH.set(hydrate_queue.qsize(), stage='hydrate')
+        QUEUE_DEPTH.set(evaluate_queue.qsize(), stage='evaluate')
+        QUEUE_DEPTH.set(dial_queue.qsize(), stage='dial')
+
+    chain = chain or build_evaluation_chain(job_title)
+    # Keeps a first-use download of the tokenizer off the event loop
+    await asyncio.to_thread(load_encoding)
+    semaphore = asyncio.Semaphore(evaluate_workers)
+    cache = EvaluationCache(bypass=bypass_cache)
+    cache_context = evaluation_cache_context(job_title)
+
+    async def hydrate_worker(client):
+        while not hydrate_queue.empty():
+            apps = hydrate_queue.get_nowait()
+            report_depths()
+            candidate_id = apps[0]['$Candidate_Id']
+            try:
+                details = await fetch_candidate_details_async(candidate_id, client)
+            except Exception as e:
+                logger.warning("Failed to fetch candidate details", extra={'candidate_id': candidate_id, 'error': str(e)})
+                details = None
+            if not details:
+                stats.add('hydrate_failed')
+                continue
+            candidate = Candidate.from_zoho(details[0])
+            for app in apps:
+                app.candidate = candidate
+            stats.add('hydrated')
+            # Blocks while the evaluators are behind
+            await evaluate_queue.put(apps)
+            report_depths()
+
+    async def evaluate_worker():
+        while (apps := await evaluate_queue.get()) is not None:
+            report_depths()
+            candidate = apps[0]
+            if prescreen:
+                _, auto_rejected = prescreen_candidates([candidate], job_description, required_tech)
+                if auto_rejected:
+                    for app in apps:
+                        record_auto_rejection(journal, app, auto_rejected[0][1], job_title)
+                    stats.add('auto_rejected')
+                    continue
+            # Another candidate record with the same email or phone may already have been evaluated
+            group = dedup.group(candidate)
+            evaluation = dedup.evaluation(group)
+            if evaluation is not None:
+                dedup.skipped()
+            else:
+                try:
+                    evaluation = await evaluate_candidate(chain, job_description, candidate, semaphore, cache, cache_context)
+                except Exception as e:
+                    for app in apps:
+                        record_failure(journal, dead_letters, app, e, job_title)
+                    stats.add('failed')
+                    continue
+                dedup.record_evaluation(group, evaluation)
+            if len(apps) > 1:
+                dedup.skipped(len(apps) - 1)
+            for app in apps:
+                status, candidate_result = record_evaluation(journal, app, evaluation, job_title)
+                dead_letters.resolve(application_key(app))
+            stats.add('evaluated')
+            if status == 'selected':
+                stats.add('shortlisted')
+                call_key = candidate_call_key(candidate_result)
+                if dial and call_key not in completed_calls:
+                    completed_calls.add(call_key)
+                    await dial_queue.put(candidate_result)
+                    report_depths()
+
+    async def dial_worker(writer, receiver, poller):
+        # Workers are the concurrency bound; the semaphore is only part of dial_candidate's contract
+        dial_semaphore = asyncio.Semaphore(1)
+        while (candidate := await dial_queue.get()) is not None:
+            report_depths()
+            stats.call_started()
+            row = await dial_candidate(retell_client, candidate, dial_semaphore, receiver, poller, dead_letters=call_dead_letters)
+            writer.write(row)
+            stats.add('dialled')
+            logger.debug("Finished call", extra={'candidate': row['Full Name']})
+
+    async def run_stages(writer=None, receiver=None):
+        dialers = []
+        if dial:
+            poller = CallStatusPoller(retell_client)
+            dialers = [asyncio.create_task(dial_worker(writer, receiver, poller)) for _ in range(dial_workers)]
+            if redial:
+                logger.info("Resuming: shortlisted candidates still to be called", extra={'candidates': len(redial)})
+        evaluators = [asyncio.create_task(evaluate_worker()) for _ in range(evaluate_workers)]
+
+        async def drive():
+            async with AsyncZohoClient() as client:
+                await asyncio.gather(
+                    *(hydrate_worker(client) for _ in range(hydrate_workers)),
+                    *(dial_queue.put(result) for result in redial),
+                )
+            for _ in evaluators:
+                await evaluate_queue.put(None)
+            await asyncio.gather(*evaluators)
+
+            for _ in dialers:
+                await dial_queue.put(None)
+            await asyncio.gather(*dialers)
+
+        try:
+            await supervise(drive(), evaluators + dialers)
+        finally:
+            for task in evaluators + dialers:
+                task.cancel()
+
+    with journal, cache, dead_letters:
+        if not dial:
+            await run_stages()
+        else:
+            retell_client = retell_client or initialize_retell()
+            # Webhooks are only used when a port is configured; otherwise every call is polled
+            receiver = await CallEventReceiver().start() if WEBHOOK_PORT else None
+            try:
+                with CallResultWriter(results_path) as writer, call_dead_letters:
+                    await run_stages(writer, receiver)
+            finally:
+                if receiver:
+                    await receiver.stop()
+        if dead_letters.entries:
+            logger.warning("Failed candidates kept for replay", extra={'path': dead_letters.path, 'failed': len(dead_letters.entries), **dead_letters.counts()})
+        journal.compact()
+        logger.info("Evaluation cache", extra=cache.stats())
+
+    logger.info("Pipeline finished", extra={
+        **stats.summary(), 'fetches_avoided': dedup.avoided['fetch'], 'llm_calls_avoided': dedup.avoided['evaluate'],
+    })
+    return save_results(journal, job_title)
+
+
+def main():
+    configure_logging()
+    metrics.start_writer()
+    selected_job = choose_job()
+    if not selected_job:
+        return
+
+    job_title = selected_job['Posting_Title']
+    selected, rejected = asyncio.run(run_pipeline(selected_job))
+    logger.info("Evaluation finished", extra={'job_title': job_title, 'selected': selected, 'rejected': rejected})
+    EvaluationJournal(journal_path(job_title)).remove()
+    metrics.log_summary()
+
+if __name__ == "__main__":
+    main()
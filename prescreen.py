@@ -0,0 +1,131 @@
+import os
+import re
+import json
+import numpy as np
+
+# Technology terms the pre-screen understands; JD and profiles are projected onto this vocabulary
+TECH_VOCABULARY = [
+    "php", "laravel", "symfony", "codeigniter", "lumen", "composer", "eloquent", "artisan", "blade",
+    "mysql", "postgresql", "mongodb", "redis", "sql", "elasticsearch",
+    "javascript", "typescript", "js", "es6", "html", "html5", "css", "css3", "sass", "scss", "less", "tailwind", "bootstrap",
+    "react", "redux", "next", "vue", "vuex", "nuxt", "angular", "rxjs", "ngrx", "svelte", "jquery",
+    "node", "express", "graphql", "rest", "api", "webpack", "vite", "babel", "jest", "cypress", "mocha",
+    "docker", "kubernetes", "aws", "azure", "gcp", "git", "ci", "cd", "linux", "nginx", "apache",
+    "microservices", "pwa", "performance", "testing",
+]
+VOCAB_INDEX = {term: i for i, term in enumerate(TECH_VOCABULARY)}
+
+# At least one of these must appear somewhere in the profile
+LARAVEL_REQUIRED_TECH = ["laravel", "php"]
+FRONTEND_REQUIRED_TECH = ["react", "vue", "angular", "javascript", "typescript"]
+
+PRESCREEN_ENABLED = os.getenv('PRESCREEN_ENABLED', '1').lower() in ('1', 'true', 'yes')
+PRESCREEN_THRESHOLDS = {
+    # Fraction of the JD's technology terms the candidate must mention
+    "min_skill_overlap": float(os.getenv('PRESCREEN_MIN_SKILL_OVERLAP', 0.1)),
+    # How far below the JD's minimum years a candidate may fall before auto-reject
+    "experience_slack_years": float(os.getenv('PRESCREEN_EXPERIENCE_SLACK_YEARS', 2)),
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#.]+")
+# Version attached to a name: PHP7, Laravel8, Angular2+, PHP7.4
+VERSION_SUFFIX_PATTERN = re.compile(r"[0-9][0-9.+]*$")
+EXPERIENCE_BAND_PATTERN = re.compile(r"(\d+)\s*(?:-|to|–)\s*(\d+)\s*\+?\s*years", re.IGNORECASE)
+EXPERIENCE_MIN_PATTERN = re.compile(r"(\d+)\s*\+?\s*years", re.IGNORECASE)
+
+
+def tokenize(text):
+    tokens = set()
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        token = token.strip(".")
+        # html5 / css3 / es6 are terms of their own; php7 / laravel8 / angular2+ are not
+        if token not in VOCAB_INDEX:
+            token = VERSION_SUFFIX_PATTERN.sub("", token).rstrip(".") or token
+        # ReactJS / React.js / Vue.js / Node.js all collapse to the base name
+        if len(token) > 4 and token.endswith("js"):
+            token = token[:-2].rstrip(".")
+        tokens.add(token)
+    return tokens
+
+
+def vectorize(texts):
+    """Binary (len(texts) x vocabulary) presence matrix."""
+    matrix = np.zeros((len(texts), len(TECH_VOCABULARY)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        columns = [VOCAB_INDEX[token] for token in tokenize(text) if token in VOCAB_INDEX]
+        matrix[row, columns] = 1.0
+    return matrix
+
+
+def parse_experience_band(job_description):
+    """(min_years, max_years) advertised by the JD, or (None, None)."""
+    match = EXPERIENCE_BAND_PATTERN.search(job_description)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    match = EXPERIENCE_MIN_PATTERN.search(job_description)
+    if match:
+        return float(match.group(1)), None
+    return None, None
+
+
+def profile_text(candidate):
+    return " ".join([
+        str(candidate.get('Skill_Set') or ''),
+        str(candidate.get('Current_Job_Title') or ''),
+        json.dumps(candidate.get('Experience_Details') or []),
+    ])
+
+
+def parse_years(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def prescreen_candidates(candidates, job_description, required_tech, thresholds=PRESCREEN_THRESHOLDS):
+    """Scores the whole pool in one pass and splits it into (passed, rejected).
+
+    rejected is a list of (candidate, reason) pairs. The checks only
+    auto-reject clear mismatches: no required technology at all, too little
+    overlap with the JD's technology terms, or experience well under the
+    advertised band. Missing experience data never rejects on its own.
+    """
+    if not candidates:
+        return [], []
+
+    profiles = vectorize([profile_text(candidate) for candidate in candidates])
+    jd_terms = vectorize([job_description])[0]
+    required = np.zeros(len(TECH_VOCABULARY), dtype=np.float32)
+    required[[VOCAB_INDEX[term] for term in required_tech]] = 1.0
+    years = np.array([parse_years(candidate.get('Experience_in_Years')) for candidate in candidates], dtype=np.float32)
+
+    jd_count = jd_terms.sum()
+    overlap = profiles @ jd_terms / jd_count if jd_count else np.ones(len(candidates), dtype=np.float32)
+    has_required = (profiles @ required) > 0
+
+    min_years, max_years = parse_experience_band(job_description)
+    if min_years is None:
+        under_experienced = np.zeros(len(candidates), dtype=bool)
+    else:
+        # NaN compares False, so unknown experience passes
+        under_experienced = years < (min_years - thresholds["experience_slack_years"])
+
+    low_overlap = overlap < thresholds["min_skill_overlap"]
+    reject = ~has_required | low_overlap | under_experienced
+
+    passed, rejected = [], []
+    for i, candidate in enumerate(candidates):
+        if not reject[i]:
+            passed.append(candidate)
+            continue
+        reasons = []
+        if not has_required[i]:
+            reasons.append(f"none of the required technologies ({', '.join(required_tech)}) found in profile")
+        if low_overlap[i]:
+            reasons.append(f"skill overlap with job description {overlap[i]:.2f} below {thresholds['min_skill_overlap']:.2f}")
+        if under_experienced[i]:
+            band = f"{min_years:g}-{max_years:g}" if max_years is not None else f"{min_years:g}+"
+            reasons.append(f"{years[i]:g} years of experience is well below the {band} year requirement")
+        rejected.append((candidate, "Auto-rejected by pre-screen: " + "; ".join(reasons)))
+    return passed, rejected
@@ -0,0 +1,169 @@
+import os
+import json
+
+PROFILE_TOKEN_BUDGET = int(os.getenv('PROFILE_TOKEN_BUDGET', 800))
+# Long free-text fields are clipped to these many characters before anything is dropped
+SUMMARY_CHAR_LIMIT = 400
+SKILLS_CHAR_LIMIT = 400
+TITLE_CHAR_LIMIT = 120
+# One profile in this many is also rendered the legacy way to estimate the savings
+LEGACY_SAMPLE_EVERY = int(os.getenv('PROFILE_LEGACY_SAMPLE_EVERY', 20))
+
+# Subform keys worth sending to the model; everything else Zoho attaches is noise
+EXPERIENCE_FIELDS = ("Occupation", "Company", "Work_Duration", "I_currently_work_here", "Summary")
+EDUCATION_FIELDS = ("Degree", "Major_Department", "Institute_School", "Duration", "Currently_pursuing")
+
+_encoding = None
+
+
+def load_encoding():
+    """Loads the tiktoken encoding once; returns False when it is unavailable.
+
+    The first load may download the encoding, so async callers run this in a
+    thread before rendering profiles on the event loop.
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            # Any failure falls back to the character estimate
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text):
+    """Token count via tiktoken when its encoding can be loaded, else ~4 characters per token."""
+    if load_encoding():
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def compact_json(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def project_entries(entries, fields):
+    projected = []
+    for entry in entries or []:
+        if not isinstance(entry, dict):
+            continue
+        kept = {field: entry[field] for field in fields if entry.get(field) not in (None, '', [], {}, False)}
+        if kept:
+            projected.append(kept)
+    return projected
+
+
+def clip(text, limit):
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def entry_end(entry):
+    """Sort key putting current and most recently ended roles first."""
+    if entry.get("I_currently_work_here"):
+        return "9999"
+    duration = entry.get("Work_Duration") or {}
+    return str(duration.get("to") or duration.get("from") or "")
+
+
+def legacy_profile(candidate):
+    """The original indent=2 rendering, kept only to measure savings against."""
+    return f"""
+        Name: {candidate.get('Full_Name', 'N/A')}
+        Current Role: {candidate.get('Current_Job_Title', 'N/A')}
+        Experience: {candidate.get('Experience_in_Years', 0)} years
+        Skills: {candidate.get('Skill_Set', 'N/A')}
+        Work Experience:
+        {json.dumps(candidate.get('Experience_Details', []), indent=2)}
+        Education: {json.dumps(candidate.get('Educational_Details', []), indent=2)}
+        """
+
+
+class ProfileRenderer:
+    """Renders candidate profiles compactly within a per-candidate token budget.
+
+    Over-budget profiles first have long skills, titles and summaries
+    clipped, then lose their
+    oldest roles and finally trailing education entries until they fit.
+    Token counts are accumulated for stats(); the legacy size is measured on
+    one profile in legacy_sample_every and the savings extrapolated from it.
+    """
+
+    def __init__(self, token_budget=PROFILE_TOKEN_BUDGET, legacy_sample_every=LEGACY_SAMPLE_EVERY):
+        self.token_budget = token_budget
+        self.legacy_sample_every = legacy_sample_every
+        self.reset()
+
+    def reset(self):
+        self.profiles = 0
+        self.truncated = 0
+        self.tokens = 0
+        self.sampled_tokens = 0
+        self.sampled_legacy_tokens = 0
+
+    def _render(self, candidate, title, skills, experience, education, omitted):
+        lines = [
+            f"Name: {candidate.get('Full_Name', 'N/A')}",
+            f"Current Role: {title}",
+            f"Experience: {candidate.get('Experience_in_Years', 0)} years",
+            f"Skills: {skills}",
+            f"Work Experience: {compact_json(experience)}",
+        ]
+        if omitted:
+            lines.append(f"({omitted} older roles omitted)")
+        lines.append(f"Education: {compact_json(education)}")
+        return "\n".join(lines)
+
+    def render(self, candidate):
+        experience = sorted(
+            project_entries(candidate.get('Experience_Details'), EXPERIENCE_FIELDS), key=entry_end, reverse=True
+        )
+        education = project_entries(candidate.get('Educational_Details'), EDUCATION_FIELDS)
+        title = str(candidate.get('Current_Job_Title', 'N/A'))
+        skills = str(candidate.get('Skill_Set', 'N/A'))
+        omitted = 0
+
+        profile = self._render(candidate, title, skills, experience, education, omitted)
+        tokens = count_tokens(profile)
+        if tokens > self.token_budget:
+            self.truncated += 1
+            title = clip(title, TITLE_CHAR_LIMIT)
+            skills = clip(skills, SKILLS_CHAR_LIMIT)
+            for entry in experience:
+                if isinstance(entry.get("Summary"), str):
+                    entry["Summary"] = clip(entry["Summary"], SUMMARY_CHAR_LIMIT)
+            profile = self._render(candidate, title, skills, experience, education, omitted)
+            tokens = count_tokens(profile)
+
+            # Always keep the most recent role and the first education entry
+            while tokens > self.token_budget and (len(experience) > 1 or len(education) > 1):
+                if len(experience) > 1:
+                    experience.pop()
+                    omitted += 1
+                else:
+                    education.pop()
+                profile = self._render(candidate, title, skills, experience, education, omitted)
+                tokens = count_tokens(profile)
+
+        if self.legacy_sample_every and self.profiles % self.legacy_sample_every == 0:
+            self.sampled_tokens += tokens
+            self.sampled_legacy_tokens += count_tokens(legacy_profile(candidate))
+        self.profiles += 1
+        self.tokens += tokens
+        return profile
+
+    def stats(self):
+        savings = 1 - self.sampled_tokens / self.sampled_legacy_tokens if self.sampled_legacy_tokens else 0.0
+        # Estimated from the sampled profiles; exact when every profile is sampled
+        saved = round(self.tokens * savings / (1 - savings)) if savings < 1 else 0
+        return {
+            'profiles': self.profiles,
+            'truncated': self.truncated,
+            'tokens': self.tokens,
+            'tokens_saved': saved,
+            'savings': savings,
+        }
+
+
+default_renderer = ProfileRenderer()
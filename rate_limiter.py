@@ -0,0 +1,116 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+RATE_LIMIT_PAUSES = metrics.counter("rate_limit_pauses_total", "429 responses that paused the client-side rate limiter")
+RATE_LIMIT_RATE = metrics.gauge("rate_limit_rate", "Current client-side request rate in requests per second")
+
+
+def parse_retry_after(headers):
+    """Seconds to wait according to Retry-After or Zoho's X-RateLimit-Reset, or None.
+
+    Expects a case-insensitive header mapping as returned by httpx/requests.
+    """
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+            except (TypeError, ValueError):
+                pass
+
+    reset = headers.get("X-RateLimit-Reset")
+    if reset:
+        try:
+            reset = float(reset)
+        except ValueError:
+            return None
+        # Zoho sends an epoch in milliseconds; tolerate epoch seconds and relative seconds too
+        if reset > 1e12:
+            return max(reset / 1000 - time.time(), 0)
+        if reset > 1e9:
+            return max(reset - time.time(), 0)
+        return reset
+    return None
+
+
+class RateLimiter:
+    """Token bucket whose refill rate adapts to the server's throttling.
+
+    Every caller reserves a token before sending; a 429 halves the rate and
+    pauses the whole bucket for the advertised (or backed-off) interval, and
+    each success creeps the rate back up. Safe to share between threads and
+    asyncio tasks.
+    """
+
+    def __init__(self, rate, burst=None, min_rate=0.5, max_rate=None, increase=0.1, base_backoff=1.0, max_backoff=60.0):
+        self.rate = rate
+        self.burst = burst or max(int(rate), 1)
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate * 2
+        self.increase = increase
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Going negative queues the caller behind earlier reservations
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, status_code, headers):
+        """Feeds a response back into the limiter; returns True if the request should be retried."""
+        with self.lock:
+            now = time.monotonic()
+            if status_code == 429:
+                # Requests already in flight when the first 429 landed don't shrink the rate again
+                if now >= self.blocked_until:
+                    self.throttled += 1
+                    self.rate = max(self.min_rate, self.rate / 2)
+                delay = parse_retry_after(headers)
+                if delay is None:
+                    delay = min(self.max_backoff, self.base_backoff * 2 ** min(self.throttled, 10))
+                # Jitter keeps the waiting callers from all returning in the same instant
+                delay += random.uniform(0, min(delay, 1.0))
+                self.blocked_until = max(self.blocked_until, now + delay)
+                self.tokens = min(self.tokens, 0)
+                RATE_LIMIT_PAUSES.inc()
+                RATE_LIMIT_RATE.set(self.rate)
+                logger.warning("API limit reached", extra={'pause_seconds': round(delay, 1), 'rate': round(self.rate, 2)})
+                return True
+
+            self.throttled = 0
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            RATE_LIMIT_RATE.set(self.rate)
+            remaining = headers.get("X-RateLimit-Remaining")
+            if remaining is not None and remaining.strip() == "0":
+                delay = parse_retry_after(headers)
+                if delay:
+                    self.blocked_until = max(self.blocked_until, now + delay)
+            return False
@@ -0,0 +1,96 @@
+import os
+import gzip
+import json
+from itertools import islice
+
+# "gzip" writes .jsonl.gz instead of .jsonl; readers pick the format from the file name
+RECORD_COMPRESSION = os.getenv('RECORD_COMPRESSION', '').lower()
+
+
+def records_path(name, directory='json', compression=RECORD_COMPRESSION):
+    suffix = '.jsonl.gz' if compression == 'gzip' else '.jsonl'
+    return os.path.join(directory, f'{name}{suffix}')
+
+
+def open_records(path, mode='r', compressed=None):
+    if compressed is None:
+        compressed = path.endswith('.gz')
+    if compressed:
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def read_records(path):
+    """Yields one record at a time from a .jsonl or .jsonl.gz file.
+
+    Plain .json files holding a single array are still accepted for files
+    written before the line format; those are loaded whole.
+    """
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+
+    with open_records(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def chunked(records, size):
+    records = iter(records)
+    while chunk := list(islice(records, size)):
+        yield chunk
+
+
+class RecordWriter:
+    """Writes records one per line and swaps the file into place on a clean close.
+
+    Readers never see a half-written file, and an exception inside the
+    with-block leaves the previous file untouched.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = f"{path}.tmp"
+        self.file = None
+        self.count = 0
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open_records(self.temp_path, 'w', compressed=self.path.endswith('.gz'))
+        return self
+
+    def write(self, record):
+        # Slotted zoho_records are stored as their flat Zoho-named dict
+        if hasattr(record, 'to_dict'):
+            record = record.to_dict()
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self, commit=True):
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        if commit:
+            os.replace(self.temp_path, self.path)
+        else:
+            os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, *exc):
+        self.close(commit=exc_type is None)
+
+
+def write_records(path, records):
+    """Streams `records` to `path`; returns how many were written."""
+    with RecordWriter(path) as writer:
+        return writer.write_all(records)
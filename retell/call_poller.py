@@ -0,0 +1,113 @@
+import time
+import asyncio
+import logging
+from instrumentation import metrics
+
+# Poll quickly while any call is still ringing or awaiting analysis, slowly once all are in conversation
+FAST_INTERVAL = 2
+SLOW_INTERVAL = 10
+# After call_status turns "ended", wait at most this long for call_analysis to be filled in
+ANALYSIS_GRACE = 30
+# A call missing from this many consecutive list results is fetched on its own
+MAX_MISSES = 3
+LIST_LIMIT = 1000
+# Calls are listed from slightly before the earliest outstanding dial time
+START_SLACK_MS = 60_000
+
+logger = logging.getLogger(__name__)
+POLL_SECONDS = metrics.histogram('retell_poll_seconds', 'Latency of one batched call.list refresh, pagination included')
+POLL_ERRORS = metrics.counter('retell_poll_errors_total', 'Failed batched call status refreshes')
+POLL_OUTSTANDING = metrics.gauge('retell_poll_outstanding_calls', 'Calls the shared poller is waiting on')
+
+
+class CallStatusPoller:
+    """Refreshes every outstanding call through one call.list request per tick.
+
+    Waiters register a call_id and get a future that resolves with the call
+    object once it has ended with its analysis (or errored). API traffic is
+    one list request per interval regardless of how many calls are active.
+    """
+
+    def __init__(self, retell_client, fast_interval=FAST_INTERVAL, slow_interval=SLOW_INTERVAL):
+        self.retell_client = retell_client
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.waiters = {}
+        self.task = None
+
+    async def wait_for_end(self, call_id, timeout):
+        """Returns the finished call object, or raises asyncio.TimeoutError."""
+        waiter = {
+            'future': asyncio.get_running_loop().create_future(),
+            'dialled_ms': int(time.time() * 1000),
+            'status': None,
+            'ended_at': None,
+            'misses': 0,
+        }
+        self.waiters[call_id] = waiter
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        try:
+            return await asyncio.wait_for(waiter['future'], timeout)
+        finally:
+            self.waiters.pop(call_id, None)
+
+    async def _list_outstanding(self):
+        lower = min(waiter['dialled_ms'] for waiter in self.waiters.values()) - START_SLACK_MS
+        calls = {}
+        pagination_key = None
+        while True:
+            kwargs = {"pagination_key": pagination_key} if pagination_key else {}
+            page = await self.retell_client.call.list(
+                filter_criteria={"call_type": ["phone_call"], "start_timestamp": {"lower_threshold": lower}},
+                limit=LIST_LIMIT,
+                sort_order="descending",
+                **kwargs,
+            )
+            for call in page:
+                calls[call.call_id] = call
+            if len(page) < LIST_LIMIT or all(call_id in calls for call_id in self.waiters):
+                return calls
+            pagination_key = page[-1].call_id
+
+    def _dispatch(self, call_id, call):
+        waiter = self.waiters.get(call_id)
+        if waiter is None or waiter['future'].done():
+            return
+        waiter['status'] = call.call_status
+        waiter['misses'] = 0
+        if call.call_status == 'error':
+            waiter['future'].set_result(call)
+        elif call.call_status == 'ended':
+            waiter['ended_at'] = waiter['ended_at'] or time.monotonic()
+            analysed = getattr(call, 'call_analysis', None) is not None
+            if analysed or time.monotonic() - waiter['ended_at'] > ANALYSIS_GRACE:
+                waiter['future'].set_result(call)
+
+    def _interval(self):
+        statuses = [waiter['status'] for waiter in self.waiters.values()]
+        if any(status in (None, 'registered', 'ended') for status in statuses):
+            return self.fast_interval
+        return self.slow_interval
+
+    async def _run(self):
+        while self.waiters:
+            POLL_OUTSTANDING.set(len(self.waiters))
+            try:
+                with POLL_SECONDS.time():
+                    calls = await self._list_outstanding()
+                for call_id in list(self.waiters):
+                    if call_id in calls:
+                        self._dispatch(call_id, calls[call_id])
+                        continue
+                    # Registered calls may not have a start timestamp yet; look them up directly if it persists
+                    waiter = self.waiters.get(call_id)
+                    if waiter:
+                        waiter['misses'] += 1
+                        if waiter['misses'] >= MAX_MISSES:
+                            self._dispatch(call_id, await self.retell_client.call.retrieve(call_id))
+            except Exception as e:
+                POLL_ERRORS.inc()
+                logger.warning("Error polling call statuses", extra={'error': str(e)})
+            await asyncio.sleep(self._interval())
+        POLL_OUTSTANDING.set(0)
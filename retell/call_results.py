@@ -0,0 +1,62 @@
+import os
+import csv
+
+CSV_HEADERS = [
+    "Full Name", "Phone Number", "Email", "Position Applied","Response",
+    "Has Laptop", "Expected Salary", "Notice Period", "Working Hours", "Recording Link"
+]
+
+
+def call_key(phone_number, position_applied):
+    # Phone numbers are written with a leading apostrophe so spreadsheets keep them as text
+    return (str(phone_number).lstrip("'"), position_applied)
+
+
+def candidate_call_key(candidate):
+    return call_key(candidate.get('phone', 'N/A'), candidate.get('position_applied', 'N/A'))
+
+
+def completed_call_keys(file_path):
+    """Keys of rows whose call finished with post-call data; error rows are left to be retried."""
+    if not os.path.isfile(file_path):
+        return set()
+    with open(file_path, newline='', encoding='utf-8') as file:
+        return {
+            call_key(row.get("Phone Number", ""), row.get("Position Applied", ""))
+            for row in csv.DictReader(file)
+            if row.get("Has Laptop") not in (None, "", "Error")
+        }
+
+
+class CallResultWriter:
+    """Appends one CSV row per finished call and forces it to disk before returning."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = None
+        self.writer = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.file_path) or '.', exist_ok=True)
+        write_header = not os.path.isfile(self.file_path) or os.path.getsize(self.file_path) == 0
+        self.file = open(self.file_path, mode='a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=CSV_HEADERS)
+        if write_header:
+            self.writer.writeheader()
+        return self
+
+    def write(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
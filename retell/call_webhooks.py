@@ -0,0 +1,145 @@
+import os
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from instrumentation import metrics
+
+WEBHOOK_HOST = os.getenv('RETELL_WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('RETELL_WEBHOOK_PORT', 0))
+WEBHOOK_PATH = '/retell/webhook'
+
+logger = logging.getLogger(__name__)
+WEBHOOK_EVENTS = metrics.counter('retell_webhook_events_total', 'Retell webhook deliveries by event, rejected signatures included')
+
+
+class CallEventReceiver:
+    """Local HTTP endpoint for Retell's call_ended / call_analyzed webhooks.
+
+    Each (call_id, event) pair maps to a future that the webhook handler
+    resolves with the event's call payload. Events are only kept for calls
+    that are expected: wait_for() expects its call until forget(), so a
+    call_analyzed that lands before its waiter is not lost, while events for
+    other campaigns on the account or for calls already forgotten are
+    dropped and memory stays bounded by the calls in flight. Callers start
+    waiting right after create_phone_call returns, before Retell can have
+    sent call_ended. Retell must be pointed at http(s)://<public host><WEBHOOK_PATH>.
+    """
+
+    def __init__(self, host=WEBHOOK_HOST, port=WEBHOOK_PORT, api_key=None, verify_signatures=True):
+        self.host = host
+        self.port = port
+        self.api_key = api_key or os.getenv('RETELL_API_KEY')
+        self.verify_signatures = verify_signatures
+        self.events = {}
+        self.expected = set()
+        self.runner = None
+
+    def _future(self, call_id, event):
+        key = (call_id, event)
+        if key not in self.events:
+            self.events[key] = asyncio.get_running_loop().create_future()
+        return self.events[key]
+
+    async def handle(self, request):
+        from aiohttp import web
+        from retell.lib.webhook_auth import verify
+        body = await request.text()
+        if self.verify_signatures and not verify(body, self.api_key, request.headers.get('x-retell-signature', '')):
+            WEBHOOK_EVENTS.inc(event='rejected')
+            return web.Response(status=401)
+
+        payload = json.loads(body)
+        event = payload.get('event')
+        WEBHOOK_EVENTS.inc(event=event)
+        call = payload.get('call') or {}
+        call_id = call.get('call_id')
+        if call_id in self.expected and event in ('call_ended', 'call_analyzed'):
+            future = self._future(call_id, event)
+            if not future.done():
+                future.set_result(call)
+        return web.Response(status=204)
+
+    async def wait_for(self, call_id, event, timeout):
+        """Returns the call payload of `event` for `call_id`, or raises asyncio.TimeoutError."""
+        self.expected.add(call_id)
+        future = self._future(call_id, event)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        finally:
+            if future.done():
+                self.events.pop((call_id, event), None)
+
+    def forget(self, call_id):
+        self.expected.discard(call_id)
+        for event in ('call_ended', 'call_analyzed'):
+            future = self.events.pop((call_id, event), None)
+            if future and not future.done():
+                future.cancel()
+
+    async def start(self):
+        # aiohttp and the Retell SDK are only loaded when webhooks are actually used
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_post(WEBHOOK_PATH, self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        # Port 0 binds an ephemeral port; report the real one
+        self.port = self.runner.addresses[0][1]
+        logger.info("Listening for Retell webhooks", extra={'host': self.host, 'port': self.port, 'path': WEBHOOK_PATH})
+        return self
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+def sign_payload(body, api_key, timestamp=None):
+    """Builds an x-retell-signature header value the receiver will accept."""
+    timestamp = timestamp or int(time.time() * 1000)
+    digest = hmac.new(api_key.encode(), (body + str(timestamp)).encode(), hashlib.sha256).hexdigest()
+    return f"v={timestamp},d={digest}"
+
+
+def sample_call(call_id, **overrides):
+    call = {
+        "call_id": call_id,
+        "call_type": "phone_call",
+        "call_status": "ended",
+        "transcript": "Agent: Hi, is this a good time to talk?\nUser: Yes.",
+        "recording_url": f"https://example.invalid/recordings/{call_id}.wav",
+        "call_analysis": {
+            "custom_analysis_data": {
+                "has_laptop": True,
+                "expected_salary": "15 LPA",
+                "notice_period": "30 days",
+                "working_hours": "Flexible",
+            }
+        },
+    }
+    call.update(overrides)
+    return call
+
+
+async def post_sample_events(url, call_id, api_key=None, delay=0.1, **overrides):
+    """Local stand-in for Retell: posts call_started, call_ended and call_analyzed for one call."""
+    from aiohttp import ClientSession
+    async with ClientSession() as session:
+        for event in ('call_started', 'call_ended', 'call_analyzed'):
+            body = json.dumps({"event": event, "call": sample_call(call_id, **overrides)})
+            headers = {"Content-Type": "application/json"}
+            if api_key:
+                headers["x-retell-signature"] = sign_payload(body, api_key)
+            async with session.post(url, data=body, headers=headers) as response:
+                response.raise_for_status()
+            await asyncio.sleep(delay)
@@ -1,59 +1,136 @@
 import csv
 import os
+import sys
 import time
-from retell import AsyncRetell
-import json
+import logging
+from itertools import islice
 from dotenv import load_dotenv
 import asyncio
 
+# Shared instrumentation lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import metrics, configure_logging
+from record_io import read_records
+from dead_letters import DeadLetterStore, CALL_DEAD_LETTER_PATH, error_class, replay_entries
+from call_webhooks import CallEventReceiver, WEBHOOK_PORT
+from call_poller import CallStatusPoller
+from call_results import CSV_HEADERS, CallResultWriter, candidate_call_key, completed_call_keys
+
 load_dotenv()
 
+# Simultaneous calls; keep within the Retell concurrency limit and phone-number capacity
+DIAL_CONCURRENCY = int(os.getenv('RETELL_DIAL_CONCURRENCY', 5))
+# Upper bound for one call from dialling to post-call analysis. Every wait
+# below is carved out of this budget: the webhook waits come first and the
+# polling fallback gets whatever is left, so a missed webhook still leaves
+# the fallback time to find a call that did finish.
+CALL_TIMEOUT = int(os.getenv('RETELL_CALL_TIMEOUT', 300))
+# Share of the budget spent waiting for call_ended / call_analyzed webhooks before polling
+WEBHOOK_CALL_TIMEOUT = int(os.getenv('RETELL_WEBHOOK_CALL_TIMEOUT', CALL_TIMEOUT // 2))
+WEBHOOK_ANALYSIS_TIMEOUT = int(os.getenv('RETELL_WEBHOOK_ANALYSIS_TIMEOUT', CALL_TIMEOUT // 10))
+# Inner waits give up this long before the budget ends, so they report an
+# incomplete call instead of being cancelled as a timeout
+DEADLINE_MARGIN = 1
+# Skip candidates that already have a completed row in the results CSV
+RESUME = os.getenv('RETELL_RESUME', '1').lower() in ('1', 'true', 'yes')
+
+logger = logging.getLogger(__name__)
+RETELL_API_SECONDS = metrics.histogram('retell_api_seconds', 'Retell API request latency by operation and outcome')
+RETELL_CALLS = metrics.counter('retell_calls_total', 'Candidate calls by outcome')
+RETELL_CALL_SECONDS = metrics.histogram('retell_call_seconds', 'Time from dialling a candidate to having post-call data')
+RETELL_CALLS_IN_FLIGHT = metrics.gauge('retell_calls_in_flight', 'Candidate calls currently dialled and not yet finished')
+
+def retell_outcome(error):
+    return 'rate_limited' if error_class(error) == 'rate_limited' else 'error'
+
 # r = AsyncRetell(api_key=os.getenv('RETELL_API_KEY'))
 # re = r.call.retrieve
 
 
 def initialize_retell():
+    # The SDK is heavy to import and only needed once calls are placed
+    from retell import AsyncRetell
     return AsyncRetell(api_key=os.getenv('RETELL_API_KEY'))
 
 async def call_candidate(retell_client, phone_number, first_name):
     RETELL_RECRUIT_PHONE = os.getenv("RETELL_RECRUIT_PHONE")
+    started = time.perf_counter()
     try:
         response = await retell_client.call.create_phone_call(
             to_number=phone_number,
             from_number=RETELL_RECRUIT_PHONE,
             retell_llm_dynamic_variables={"first_name": first_name}
         )
+        RETELL_API_SECONDS.observe(time.perf_counter() - started, operation='create_phone_call', outcome='success')
         return response
     except Exception as e:
-        print(f"Error calling {phone_number}: {e}")
-        return {"error": str(e)}
+        RETELL_API_SECONDS.observe(time.perf_counter() - started, operation='create_phone_call', outcome=retell_outcome(e))
+        logger.warning("Error calling candidate", extra={'phone': phone_number, 'error': str(e)})
+        return {"error": str(e), "error_class": error_class(e)}
+
+def as_dict(response):
+    # Webhooks deliver plain dicts, the SDK returns pydantic models
+    return response if isinstance(response, dict) else response.model_dump()
+
+async def wait_for_call_completion(retell_client, call_id, max_retries=20, delay=10, receiver=None, poller=None, deadline=None):
+    """Waits for the call's call_analyzed webhook, polling the API if no receiver or no webhook arrives.
+
+    With a shared CallStatusPoller the fallback rides on its batched list
+    requests; without one the call is polled on its own. deadline is the
+    event-loop time by which the call must be settled (see CALL_TIMEOUT);
+    every wait is cut to fit before it.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = deadline or loop.time() + CALL_TIMEOUT
+
+    def remaining():
+        return max(0, deadline - DEADLINE_MARGIN - loop.time())
+
+    if receiver:
+        try:
+            await receiver.wait_for(call_id, 'call_ended', min(WEBHOOK_CALL_TIMEOUT, remaining()))
+            return await receiver.wait_for(call_id, 'call_analyzed', min(WEBHOOK_ANALYSIS_TIMEOUT, remaining()))
+        except asyncio.TimeoutError:
+            logger.warning("No webhook received, falling back to polling", extra={'call_id': call_id, 'remaining_seconds': round(remaining())})
+        finally:
+            receiver.forget(call_id)
+
+    if poller:
+        try:
+            return await poller.wait_for_end(call_id, remaining())
+        except asyncio.TimeoutError:
+            logger.warning("Max wait reached, call did not complete", extra={'call_id': call_id})
+            return None
 
-async def wait_for_call_completion(retell_client, call_id, max_retries=20, delay=10):
-    """Polls the API until the call is completed or failed."""
     for _ in range(max_retries):
+        if remaining() <= 0:
+            break
+        started = time.perf_counter()
         try:
             status_response = await retell_client.call.retrieve(call_id)
+            RETELL_API_SECONDS.observe(time.perf_counter() - started, operation='retrieve', outcome='success')
             status = status_response.call_status
             # print(status_response)
-            print(f"Call Status: {status}")
+            logger.debug("Call status", extra={'call_id': call_id, 'status': status})
 
             if status in ["ended", "error"]:
-                print("Call ended, waiting for 10 seconds before checking analysis...")
-                await asyncio.sleep(10)
+                logger.debug("Call ended, waiting for 10 seconds before checking analysis", extra={'call_id': call_id})
+                await asyncio.sleep(min(10, remaining()))
                 return status_response
-            await asyncio.sleep(delay)
+            await asyncio.sleep(min(delay, remaining()))
         except Exception as e:
-            print(f"Error polling call status: {e}")
+            RETELL_API_SECONDS.observe(time.perf_counter() - started, operation='retrieve', outcome=retell_outcome(e))
+            logger.warning("Error polling call status", extra={'call_id': call_id, 'error': str(e)})
             return None
-    print("Max retries reached. Call did not complete.")
+    logger.warning("Max retries reached, call did not complete", extra={'call_id': call_id})
     return None
 
 async def extract_post_call_analysis(response):
     try:
         # Debug the full response structure
         # print(response.model_dump())  # Pydantic 2.0 compliant
-        response = response.model_dump()
-        print(response)
+        response = as_dict(response)
+        logger.debug("Post-call response", extra={'call_id': response.get('call_id')})
         # Extract necessary fields if available
         return {
             "Has Laptop": response.get('call_analysis').get("custom_analysis_data").get('has_laptop', 'N/A'),
@@ -63,7 +140,7 @@ async def extract_post_call_analysis(response):
             "Recording Link" : response.get('recording_url', 'N/A')
         }
     except Exception as e:
-        print(f"Error extracting post-call data: {e}")
+        logger.warning("Error extracting post-call data", extra={'error': str(e)})
         return {
             "Has Laptop": "Error",
             "Expected Salary": "Error",
@@ -73,10 +150,7 @@ async def extract_post_call_analysis(response):
         }
 
 def save_to_csv(file_path, data):
-    headers = [
-        "Full Name", "Phone Number", "Email", "Position Applied","Response", 
-        "Has Laptop", "Expected Salary", "Notice Period", "Working Hours", "Recording Link"
-    ]
+    headers = CSV_HEADERS
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     
     # Check if file exists
@@ -94,62 +168,196 @@ def save_to_csv(file_path, data):
         writer.writerows(data)
 
 
-async def main():
-    with open(r'json/demo_candidates.json', 'r') as file:
-        selected_candidates = json.load(file)
+class CallFailed(Exception):
+    """A call that could not be placed or did not produce post-call data."""
 
-    retell_client = initialize_retell()
-    responses = []
-
-    for candidate in selected_candidates:
-        phone_number = candidate.get('phone', 'N/A')
-        full_name = candidate.get('full_name', 'N/A')
-        first_name = candidate.get('first_name', 'N/A')
-        email = candidate.get('email', 'N/A')
-        position_applied = candidate.get('position_applied', 'N/A')
-
-        print(f"Initiating call to {full_name} at {phone_number}...")
-        response = await call_candidate(retell_client, phone_number, first_name)
-
-        if isinstance(response, dict) and "error" in response:
-            post_call_data = {
-                "Has Laptop": "Error",
-                "Expected Salary": "Error",
-                "Notice Period": "Error",
-                "Working Hours": "Error",
-                "Recording Link": "Error"
-            }
-            response_text = response["error"]
+    def __init__(self, message, error_class):
+        super().__init__(message)
+        self.error_class = error_class
+
+
+def error_post_call_data():
+    return {
+        "Has Laptop": "Error",
+        "Expected Salary": "Error",
+        "Notice Period": "Error",
+        "Working Hours": "Error",
+        "Recording Link": "Error"
+    }
+
+async def place_call(retell_client, candidate, receiver=None, poller=None, deadline=None):
+    phone_number = candidate.get('phone', 'N/A')
+    full_name = candidate.get('full_name', 'N/A')
+    first_name = candidate.get('first_name', 'N/A')
+
+    logger.debug("Initiating call", extra={'candidate': full_name, 'phone': phone_number})
+    response = await call_candidate(retell_client, phone_number, first_name)
+
+    if isinstance(response, dict) and "error" in response:
+        raise CallFailed(response["error"], response.get("error_class", 'other'))
+
+    # Wait for call to complete
+    completed_response = await wait_for_call_completion(retell_client, response.call_id, receiver=receiver, poller=poller, deadline=deadline)
+    if completed_response:
+        post_call_data = await extract_post_call_analysis(completed_response)
+        response_text = as_dict(completed_response).get("transcript") or "No transcript available"
+        return response_text, post_call_data
+    return "Call did not complete", error_post_call_data()
+
+def call_candidate_id(candidate):
+    # Rows written before results carried candidate_id fall back to the phone number
+    return candidate.get('candidate_id') or candidate_call_key(candidate)[0]
+
+def call_dead_letter_key(candidate):
+    """One entry per person and opening, like candidate_call_key; a call for one job never clears another's."""
+    return f"{call_candidate_id(candidate)}|{candidate.get('position_applied', 'N/A')}"
+
+async def dial_candidate(retell_client, candidate, semaphore, receiver=None, poller=None, timeout=CALL_TIMEOUT, dead_letters=None):
+    """Runs one call end to end; failures and timeouts become an error row instead of propagating.
+
+    With a DeadLetterStore, failed calls are added to it for a later
+    replay and completed ones are resolved.
+    """
+    failure = None
+    async with semaphore:
+        RETELL_CALLS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            # The inner waits share this deadline and settle just before the outer timeout fires
+            deadline = asyncio.get_running_loop().time() + timeout
+            response_text, post_call_data = await asyncio.wait_for(place_call(retell_client, candidate, receiver, poller, deadline), timeout)
+            outcome = 'error' if post_call_data.get('Has Laptop') == 'Error' else 'completed'
+            if outcome == 'error':
+                failure = CallFailed(response_text, 'call_incomplete')
+        except asyncio.TimeoutError as e:
+            logger.warning("Call timed out", extra={'candidate': candidate.get('full_name', 'N/A'), 'timeout_seconds': timeout})
+            response_text, post_call_data = "Call timed out", error_post_call_data()
+            outcome = 'timeout'
+            failure = e
+        except Exception as e:
+            logger.warning("Call failed", extra={'candidate': candidate.get('full_name', 'N/A'), 'error': str(e)})
+            response_text, post_call_data = str(e), error_post_call_data()
+            outcome = 'error'
+            failure = e
+        finally:
+            RETELL_CALLS_IN_FLIGHT.dec()
+        RETELL_CALLS.inc(outcome=outcome)
+        RETELL_CALL_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+
+    if dead_letters is not None:
+        if failure is not None:
+            dead_letters.add(call_candidate_id(candidate), dict(candidate), failure, 1, key=call_dead_letter_key(candidate))
         else:
-            # Wait for call to complete
-            completed_response = await wait_for_call_completion(retell_client, response.call_id)
-            if completed_response:
-                post_call_data = await extract_post_call_analysis(completed_response)
-                response_text = completed_response.model_dump().get("transcript") or "No transcript available"
-            else:
-                post_call_data = {
-                    "Has Laptop": "Error",
-                    "Expected Salary": "Error",
-                    "Notice Period": "Error",
-                    "Working Hours": "Error",
-                    "Recording Link": "Error"
-                }
-                response_text = "Call did not complete"
-
-        # Save response
-        responses.append({
-            "Full Name": full_name,
-            "Phone Number": f"'{phone_number}",
-            "Email": email,
-            "Position Applied":position_applied, 
-            "Response": response_text,
-            **post_call_data
-        })
-
-    # Save to CSV
+            dead_letters.resolve(call_dead_letter_key(candidate))
+
+    return {
+        "Full Name": candidate.get('full_name', 'N/A'),
+        "Phone Number": f"'{candidate.get('phone', 'N/A')}",
+        "Email": candidate.get('email', 'N/A'),
+        "Position Applied": candidate.get('position_applied', 'N/A'),
+        "Response": response_text,
+        **post_call_data
+    }
+
+async def dial_candidates(retell_client, candidates, concurrency=DIAL_CONCURRENCY, receiver=None, poller=None, dead_letters=None):
+    """Keeps up to `concurrency` calls in flight and yields each result row as its call finishes.
+
+    candidates can be any iterable, such as a read_records() stream; the
+    next candidate is only taken once a call slot frees up.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    poller = poller or CallStatusPoller(retell_client)
+    candidates = iter(candidates)
+    in_flight = set()
+    try:
+        while True:
+            for candidate in islice(candidates, concurrency - len(in_flight)):
+                in_flight.add(asyncio.create_task(dial_candidate(retell_client, candidate, semaphore, receiver, poller, dead_letters=dead_letters)))
+            if not in_flight:
+                return
+            finished, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                yield task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+async def main(resume=RESUME, candidates_path=r'json/demo_candidates.json'):
+    # A JSON list or a .jsonl/.jsonl.gz stream such as json/selected_candidates_<job>.jsonl
+    selected_candidates = read_records(candidates_path)
+
     csv_file_path = rf'csv/candidate_responses.csv'
-    save_to_csv(csv_file_path, responses)
-    print(f"Responses saved to {csv_file_path}")
+    completed = completed_call_keys(csv_file_path) if resume else set()
+    skipped = 0
+
+    def not_yet_called(candidates):
+        # Also drops repeats within the file, so a person shortlisted through several applications is called once
+        nonlocal skipped
+        for candidate in candidates:
+            if candidate_call_key(candidate) in completed:
+                skipped += 1
+            else:
+                completed.add(candidate_call_key(candidate))
+                yield candidate
+
+    retell_client = initialize_retell()
+    finished = 0
+
+    # Webhooks are only used when a port is configured; otherwise every call is polled
+    receiver = await CallEventReceiver().start() if WEBHOOK_PORT else None
+    try:
+        # Each row hits the disk as its call finishes, so a crash loses at most the calls in flight
+        with CallResultWriter(csv_file_path) as writer, DeadLetterStore(CALL_DEAD_LETTER_PATH, 'dial') as dead_letters:
+            async for row in dial_candidates(retell_client, not_yet_called(selected_candidates), receiver=receiver, dead_letters=dead_letters):
+                writer.write(row)
+                finished += 1
+                logger.info("Finished call", extra={'candidate': row['Full Name'], 'finished': finished})
+    finally:
+        if receiver:
+            await receiver.stop()
+
+    if skipped:
+        logger.info("Skipped candidates already called or listed twice", extra={'skipped': skipped})
+
+    logger.info("Responses saved", extra={'path': csv_file_path})
+
+async def replay_failed_calls(concurrency=DIAL_CONCURRENCY, csv_file_path=r'csv/candidate_responses.csv'):
+    """Dials only the candidates in the calls dead-letter store, each after its error-class backoff."""
+    dead_letters = DeadLetterStore(CALL_DEAD_LETTER_PATH, 'dial')
+    dead_letters.load()
+    entries = dead_letters.pending()
+    if not entries:
+        logger.info("No failed calls to replay")
+        return 0, 0
+
+    retell_client = initialize_retell()
+    poller = CallStatusPoller(retell_client)
+    semaphore = asyncio.Semaphore(concurrency)
+    receiver = await CallEventReceiver().start() if WEBHOOK_PORT else None
+    try:
+        with CallResultWriter(csv_file_path) as writer, dead_letters:
+            logger.info("Replaying failed calls", extra={'candidates': len(entries), **dead_letters.counts()})
+
+            async def replay(entry):
+                row = await dial_candidate(retell_client, entry['payload'], semaphore, receiver, poller, dead_letters=dead_letters)
+                writer.write(row)
+                return row['Has Laptop'] != 'Error'
+
+            # dial_candidate's semaphore bounds the calls; replay_entries only staggers the starts
+            resolved, failed = await replay_entries(entries, replay, len(entries), 'dial')
+            dead_letters.compact()
+    finally:
+        if receiver:
+            await receiver.stop()
+
+    logger.info("Replay finished", extra={'resolved': resolved, 'still_failed': failed})
+    return resolved, failed
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    configure_logging()
+    if '--replay-failed' in sys.argv[1:]:
+        asyncio.run(replay_failed_calls())
+    else:
+        asyncio.run(main())
+    metrics.log_summary()
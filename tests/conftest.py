@@ -0,0 +1,6 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules import each other by bare name from the repo root and retell/, as the scripts do
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'retell')]
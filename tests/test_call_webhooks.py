@@ -0,0 +1,76 @@
+import json
+import asyncio
+
+import pytest
+from aiohttp import ClientSession
+
+from call_webhooks import WEBHOOK_PATH, CallEventReceiver, post_sample_events
+
+API_KEY = "test-key"
+
+
+async def start_receiver():
+    receiver = CallEventReceiver(host='127.0.0.1', port=0, api_key=API_KEY)
+    await receiver.start()
+    return receiver, f"http://127.0.0.1:{receiver.port}{WEBHOOK_PATH}"
+
+
+def test_signed_events_resolve_waiters():
+    async def scenario():
+        receiver, url = await start_receiver()
+        try:
+            ended = asyncio.create_task(receiver.wait_for("call-1", "call_ended", timeout=5))
+            analyzed = asyncio.create_task(receiver.wait_for("call-1", "call_analyzed", timeout=5))
+            await asyncio.sleep(0)
+            await post_sample_events(url, "call-1", api_key=API_KEY, delay=0)
+            return receiver.port, await ended, await analyzed
+        finally:
+            await receiver.stop()
+
+    port, ended, analyzed = asyncio.run(scenario())
+    assert port != 0
+    assert ended["call_id"] == "call-1"
+    assert analyzed["call_analysis"]["custom_analysis_data"]["has_laptop"] is True
+
+
+def test_unsigned_post_is_rejected():
+    async def scenario():
+        receiver, url = await start_receiver()
+        try:
+            body = json.dumps({"event": "call_ended", "call": {"call_id": "call-1"}})
+            async with ClientSession() as session:
+                async with session.post(url, data=body, headers={"Content-Type": "application/json"}) as response:
+                    return response.status, receiver.events
+        finally:
+            await receiver.stop()
+
+    status, events = asyncio.run(scenario())
+    assert status == 401
+    assert events == {}
+
+
+def test_events_for_unexpected_calls_are_dropped():
+    async def scenario():
+        receiver, url = await start_receiver()
+        try:
+            await post_sample_events(url, "someone-else", api_key=API_KEY, delay=0)
+            return dict(receiver.events)
+        finally:
+            await receiver.stop()
+
+    assert asyncio.run(scenario()) == {}
+
+
+def test_events_after_forget_are_dropped():
+    async def scenario():
+        receiver, url = await start_receiver()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await receiver.wait_for("call-1", "call_ended", timeout=0.01)
+            receiver.forget("call-1")
+            await post_sample_events(url, "call-1", api_key=API_KEY, delay=0)
+            return dict(receiver.events)
+        finally:
+            await receiver.stop()
+
+    assert asyncio.run(scenario()) == {}
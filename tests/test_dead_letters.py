@@ -0,0 +1,30 @@
+import pytest
+
+from dead_letters import error_class
+
+
+class OutputParserException(ValueError):
+    pass
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+class APIStatusError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize("error, expected", [
+    (APIStatusError("Too many requests", 429), 'rate_limited'),
+    (ResourceExhausted("quota exceeded"), 'rate_limited'),
+    (RuntimeError("429 Resource has been exhausted"), 'rate_limited'),
+    (OutputParserException('Invalid json output: {"expected_salary": "429000"}'), 'invalid_response'),
+    (APIStatusError("Invalid to_number +91 98429 12345", 400), 'other'),
+    (APIStatusError("Bad gateway", 502), 'server_error'),
+    (TimeoutError(), 'timeout'),
+])
+def test_error_class(error, expected):
+    assert error_class(error) == expected
@@ -0,0 +1,41 @@
+import pytest
+
+from prescreen import FRONTEND_REQUIRED_TECH, LARAVEL_REQUIRED_TECH, prescreen_candidates, tokenize
+
+LARAVEL_JD = "Senior Laravel Developer, 5-8 years. PHP, Laravel, MySQL, Redis, REST APIs, Docker."
+FRONTEND_JD = "Senior Frontend Developer, 5+ years. React, Vue or Angular with TypeScript, HTML5, CSS3."
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("PHP7", {"php"}),
+    ("Laravel8", {"laravel"}),
+    ("MySQL8", {"mysql"}),
+    ("Angular2+", {"angular"}),
+    ("Vue3", {"vue"}),
+    ("PHP7.4", {"php"}),
+    ("VueJS3", {"vue"}),
+    ("HTML5 CSS3 ES6", {"html5", "css3", "es6"}),
+])
+def test_tokenize_strips_version_suffixes(text, expected):
+    assert tokenize(text) == expected
+
+
+def test_versioned_laravel_skills_pass():
+    candidate = {'Skill_Set': "PHP7, Laravel8, MySQL8", 'Experience_in_Years': 7}
+    passed, rejected = prescreen_candidates([candidate], LARAVEL_JD, LARAVEL_REQUIRED_TECH)
+    assert passed == [candidate]
+    assert rejected == []
+
+
+def test_versioned_angular_skills_pass():
+    candidate = {'Skill_Set': "Angular2+, TypeScript", 'Experience_in_Years': 6}
+    passed, rejected = prescreen_candidates([candidate], FRONTEND_JD, FRONTEND_REQUIRED_TECH)
+    assert passed == [candidate]
+    assert rejected == []
+
+
+def test_unrelated_skills_still_rejected():
+    candidate = {'Skill_Set': "Java8, Spring", 'Experience_in_Years': 7}
+    passed, rejected = prescreen_candidates([candidate], LARAVEL_JD, LARAVEL_REQUIRED_TECH)
+    assert passed == []
+    assert "none of the required technologies" in rejected[0][1]
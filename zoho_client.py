@@ -0,0 +1,135 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import httpx
+from auth.zoho_auth import get_access_token, get_access_token_async
+from instrumentation import metrics
+from rate_limiter import RateLimiter
+
+BASE_URL = os.getenv("ZOHO_BASE_URL", "https://recruit.zoho.in/recruit/v2/")
+TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+POOL_SIZE = 20
+MAX_ATTEMPTS = 5
+# 5xx responses are retried with exponential backoff, within MAX_ATTEMPTS, this many times
+SERVER_ERROR_RETRIES = int(os.getenv("ZOHO_SERVER_ERROR_RETRIES", 3))
+SERVER_ERROR_BACKOFF = 1.0
+
+# One limiter paces every Zoho call in the process, sync and async alike
+zoho_rate_limiter = RateLimiter(
+    rate=float(os.getenv("ZOHO_RATE_LIMIT", 5)),
+    max_rate=float(os.getenv("ZOHO_MAX_RATE_LIMIT", 10)),
+)
+
+
+ZOHO_REQUEST_SECONDS = metrics.histogram("zoho_request_seconds", "Zoho Recruit request latency, rate limiter waits excluded")
+ZOHO_RESPONSES = metrics.counter("zoho_responses_total", "Zoho Recruit responses by module and status code")
+ZOHO_RETRIES = metrics.counter("zoho_retries_total", "Zoho Recruit requests retried after a 429 or a 5xx, by module and reason")
+
+
+def auth_headers(access_token):
+    return {"Authorization": f"Zoho-oauthtoken {access_token}"}
+
+
+def server_error_delay(retry):
+    return SERVER_ERROR_BACKOFF * 2 ** retry * random.uniform(1, 1.5)
+
+
+def observe_response(endpoint, response, started):
+    # Label by module only; per-record paths would explode the series count
+    module = endpoint.split("/")[0]
+    ZOHO_REQUEST_SECONDS.observe(time.perf_counter() - started, module=module)
+    ZOHO_RESPONSES.inc(module=module, status=response.status_code)
+
+
+class ZohoClient:
+    """Keep-alive connection pool to Zoho Recruit with the auth header injected per request."""
+
+    def __init__(self, base_url=BASE_URL, timeout=TIMEOUT, pool_size=POOL_SIZE, limiter=zoho_rate_limiter):
+        self.limiter = limiter
+        self.client = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    def get(self, endpoint, params=None, headers=None, max_attempts=MAX_ATTEMPTS):
+        """GET through the rate limiter; 429s and 5xx are retried and only returned once attempts run out."""
+        server_errors = 0
+        for _ in range(max_attempts):
+            self.limiter.acquire()
+            access_token = get_access_token()
+            started = time.perf_counter()
+            response = self.client.get(endpoint, params=params, headers={**(headers or {}), **auth_headers(access_token)})
+            observe_response(endpoint, response, started)
+            if self.limiter.record(response.status_code, response.headers):
+                ZOHO_RETRIES.inc(module=endpoint.split("/")[0], reason="throttled")
+            elif response.status_code >= 500 and server_errors < SERVER_ERROR_RETRIES:
+                ZOHO_RETRIES.inc(module=endpoint.split("/")[0], reason="server_error")
+                time.sleep(server_error_delay(server_errors))
+                server_errors += 1
+            else:
+                break
+        return response
+
+    def close(self):
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncZohoClient:
+    """asyncio counterpart of ZohoClient; create it inside the event loop that uses it."""
+
+    def __init__(self, base_url=BASE_URL, timeout=TIMEOUT, pool_size=POOL_SIZE, limiter=zoho_rate_limiter):
+        self.limiter = limiter
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def get(self, endpoint, params=None, headers=None, max_attempts=MAX_ATTEMPTS):
+        server_errors = 0
+        for _ in range(max_attempts):
+            await self.limiter.acquire_async()
+            access_token = await get_access_token_async()
+            started = time.perf_counter()
+            response = await self.client.get(endpoint, params=params, headers={**(headers or {}), **auth_headers(access_token)})
+            observe_response(endpoint, response, started)
+            if self.limiter.record(response.status_code, response.headers):
+                ZOHO_RETRIES.inc(module=endpoint.split("/")[0], reason="throttled")
+            elif response.status_code >= 500 and server_errors < SERVER_ERROR_RETRIES:
+                ZOHO_RETRIES.inc(module=endpoint.split("/")[0], reason="server_error")
+                await asyncio.sleep(server_error_delay(server_errors))
+                server_errors += 1
+            else:
+                break
+        return response
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_zoho_client():
+    """Process-wide ZohoClient shared by every sync fetcher and worker thread."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ZohoClient()
+        return _client
@@ -0,0 +1,181 @@
+"""Compact records holding only the Zoho fields this tool reads.
+
+Zoho returns every field of a record (often 80+ keys, with nested owner and
+layout objects). Requests ask for the fields below via Zoho's `fields`
+parameter, and what comes back is kept in __slots__ records instead of
+dicts. Both classes answer .get()/[] with the Zoho API name, so code
+written against the raw dicts works unchanged.
+
+Candidates module
+    Zoho field             attribute             read by
+    id                     id                    candidate store key, candidate_key fallback
+    First_Name             first_name            call greeting
+    Last_Name              last_name             evaluation result
+    Full_Name              full_name             profile, results, logs
+    Email                  email                 results, call rows, candidate_key fallback
+    Mobile                 mobile                number dialled
+    Current_Job_Title      current_job_title     profile, pre-screen
+    Experience_in_Years    experience_in_years   profile, pre-screen
+    Skill_Set              skill_set             profile, pre-screen
+    Experience_Details     experience_details    profile, pre-screen; subform entries
+                                                 keep profile_renderer.EXPERIENCE_FIELDS
+    Educational_Details    educational_details   profile; entries keep EDUCATION_FIELDS
+    Modified_Time          modified_time         incremental sync
+
+Applications module
+    Zoho field             attribute             read by
+    id                     id                    candidate store key, application_key
+    $Candidate_Id          candidate_id          link to the candidate, candidate_key
+    Posting_Title          posting_title         matching applications to job openings
+    Modified_Time          modified_time         incremental sync
+
+An Application carries its hydrated Candidate. Lookups check the
+candidate first and then the application, which matches the old
+`app.update(candidate)` merge, and to_dict() flattens both the same way.
+That merge hides the application's own `id` behind the candidate's, so
+the application ID is also exposed as APPLICATION_ID ("$Application_Id"),
+which to_dict() writes and from_zoho() reads back from flattened records.
+"""
+import os
+
+from profile_renderer import EXPERIENCE_FIELDS, EDUCATION_FIELDS
+
+# Ask Zoho for only the mapped fields; switch off if an endpoint rejects the fields parameter
+FIELD_PROJECTION = os.getenv('ZOHO_FIELD_PROJECTION', '1').lower() in ('1', 'true', 'yes')
+
+APPLICATION_ID = '$Application_Id'
+
+_MISSING = object()
+
+
+def project_subform(entries, fields):
+    if not isinstance(entries, list):
+        return entries
+    return [
+        {field: entry[field] for field in fields if field in entry} if isinstance(entry, dict) else entry
+        for entry in entries
+    ]
+
+
+class ZohoRecord:
+    """Base for slotted records; FIELDS maps Zoho API names to slot names."""
+
+    __slots__ = ()
+    FIELDS = {}
+
+    @classmethod
+    def from_zoho(cls, record):
+        """Builds a record from a Zoho dict; fields absent from `record` stay unset, as in a dict."""
+        if isinstance(record, cls):
+            return record
+        instance = cls()
+        for name, attr in cls.FIELDS.items():
+            if name in record:
+                setattr(instance, attr, record[name])
+        return instance
+
+    @classmethod
+    def fields_param(cls):
+        """Comma-separated API names for Zoho's `fields` parameter, or None with projection off.
+
+        `id` and `$`-prefixed system fields are always returned, and Zoho
+        rejects them as field names.
+        """
+        if not FIELD_PROJECTION:
+            return None
+        return ",".join(name for name in cls.FIELDS if name != 'id' and not name.startswith('$'))
+
+    def get(self, name, default=None):
+        attr = self.FIELDS.get(name)
+        return getattr(self, attr, default) if attr else default
+
+    def __getitem__(self, name):
+        value = self.get(name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return self.get(name, _MISSING) is not _MISSING
+
+    def to_dict(self):
+        return {name: getattr(self, attr) for name, attr in self.FIELDS.items() if hasattr(self, attr)}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Candidate(ZohoRecord):
+    __slots__ = (
+        'id', 'first_name', 'last_name', 'full_name', 'email', 'mobile', 'current_job_title',
+        'experience_in_years', 'skill_set', 'experience_details', 'educational_details', 'modified_time',
+    )
+    FIELDS = {
+        'id': 'id',
+        'First_Name': 'first_name',
+        'Last_Name': 'last_name',
+        'Full_Name': 'full_name',
+        'Email': 'email',
+        'Mobile': 'mobile',
+        'Current_Job_Title': 'current_job_title',
+        'Experience_in_Years': 'experience_in_years',
+        'Skill_Set': 'skill_set',
+        'Experience_Details': 'experience_details',
+        'Educational_Details': 'educational_details',
+        'Modified_Time': 'modified_time',
+    }
+
+    @classmethod
+    def from_zoho(cls, record):
+        candidate = super().from_zoho(record)
+        # Subform rows carry their own ids, layouts and owners; keep what the profile renders
+        if hasattr(candidate, 'experience_details'):
+            candidate.experience_details = project_subform(candidate.experience_details, EXPERIENCE_FIELDS)
+        if hasattr(candidate, 'educational_details'):
+            candidate.educational_details = project_subform(candidate.educational_details, EDUCATION_FIELDS)
+        return candidate
+
+
+class Application(ZohoRecord):
+    __slots__ = ('id', 'candidate_id', 'posting_title', 'modified_time', 'candidate')
+    FIELDS = {
+        'id': 'id',
+        '$Candidate_Id': 'candidate_id',
+        'Posting_Title': 'posting_title',
+        'Modified_Time': 'modified_time',
+    }
+
+    def __init__(self):
+        self.candidate = None
+
+    @classmethod
+    def from_zoho(cls, record, candidate=None):
+        """Builds an application, attaching `candidate` (a dict or Candidate) when given.
+
+        A flattened detailed record, as written by to_dict(), is passed as
+        both arguments.
+        """
+        application = super().from_zoho(record)
+        # In a flattened record `id` is the candidate's; the application's own ID travels separately
+        if isinstance(record, dict) and APPLICATION_ID in record:
+            application.id = record[APPLICATION_ID]
+        if candidate is not None:
+            application.candidate = Candidate.from_zoho(candidate)
+        return application
+
+    def get(self, name, default=None):
+        if name == APPLICATION_ID:
+            return getattr(self, 'id', default)
+        if self.candidate is not None:
+            value = self.candidate.get(name, _MISSING)
+            if value is not _MISSING:
+                return value
+        return super().get(name, default)
+
+    def to_dict(self):
+        record = super().to_dict()
+        if self.candidate is not None:
+            record.update(self.candidate.to_dict())
+        if hasattr(self, 'id'):
+            record[APPLICATION_ID] = self.id
+        return record